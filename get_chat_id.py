@@ -3,97 +3,243 @@
 Скрипт для получения Chat ID
 """
 
+import json
 import os
+import re
+import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Загрузка переменных из .env
+# Быстрый JSON-парсер, если установлен (orjson/ujson), иначе стандартный json
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    from orjson import loads as _json_loads
 except ImportError:
-    if os.path.exists('.env'):
-        with open('.env', 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip().strip('"').strip("'")
+    try:
+        from ujson import loads as _json_loads
+    except ImportError:
+        _json_loads = json.loads
 
-TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
+ENV_CACHE_FILE = '.env.cache.json'
+
+# Разбор строк .env одним скомпилированным паттерном вместо
+# strip/startswith/split на каждую строку
+_ENV_LINE_RE = re.compile(
+    r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s#]*))',
+    re.MULTILINE
+)
+
+
+def _load_env_fallback():
+    """Разбор .env вручную с кешированием результата по mtime файла."""
+    if not os.path.exists('.env'):
+        return
+    mtime_ns = os.stat('.env').st_mtime_ns
+    # Тёплый запуск: берём уже разобранные переменные из кеша
+    try:
+        with open(ENV_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('mtime_ns') == mtime_ns:
+            os.environ.update(cached.get('env', {}))
+            return
+    except (OSError, ValueError):
+        pass
+    parsed = {}
+    with open('.env', 'rb') as f:
+        text = f.read().decode('utf-8', 'replace')
+    for m in _ENV_LINE_RE.finditer(text):
+        value = m.group(2) or m.group(3) or m.group(4) or ''
+        parsed[m.group(1)] = value
+    os.environ.update(parsed)
+    try:
+        with open(ENV_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'mtime_ns': mtime_ns, 'env': parsed}, f)
+    except OSError:
+        pass  # кеш не обязателен
+
+
+# Загрузка переменных из .env — только если токена ещё нет в окружении:
+# при export из shell импорт dotenv и чтение файла не нужны вовсе
+if not os.environ.get('TELEGRAM_BOT_TOKEN') and os.path.exists('.env'):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        _load_env_fallback()
+
+# Снимок окружения: дальше работаем с обычным dict вместо os.environ
+_ENV = dict(os.environ)
+TELEGRAM_BOT_TOKEN = _ENV.get('TELEGRAM_BOT_TOKEN', '')
+
+# URL собираем один раз, а не на каждый запрос
+UPDATES_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
+
+# Одна сессия на процесс: переиспользуем TCP/TLS-соединение к api.telegram.org
+# вместо нового handshake на каждый запрос
+SESSION = requests.Session()
+# Ретраи только на временные ошибки (429/5xx) с экспоненциальной паузой
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'})
+    )
+))
+SESSION.headers.update({
+    "Connection": "keep-alive",
+    "Accept-Encoding": "gzip, deflate"
+})
+
+_MISSING_TOKEN_MSG = (
+    "❌ TELEGRAM_BOT_TOKEN не установлен!\n"
+    "Установите: export TELEGRAM_BOT_TOKEN='ваш_токен'\n"
+)
 
 if not TELEGRAM_BOT_TOKEN:
-    print("❌ TELEGRAM_BOT_TOKEN не установлен!")
-    print("Установите: export TELEGRAM_BOT_TOKEN='ваш_токен'")
-    exit(1)
-
-print("=" * 60)
-print("📱 ПОЛУЧЕНИЕ CHAT ID ДЛЯ TELEGRAM БОТА")
-print("=" * 60)
-print("\n⚠️ ВАЖНО: Chat ID - это НЕ ID бота!")
-print("   Chat ID - это ID вашего личного чата или канала")
-print("\n" + "-" * 60)
-print("ИНСТРУКЦИЯ:")
-print("-" * 60)
-print("\n1. Откройте Telegram")
-print("2. Найдите вашего бота (поиск по имени бота)")
-print("3. Напишите боту ЛЮБОЕ сообщение (например: /start или 'Привет')")
-print("4. Затем запустите этот скрипт снова")
-print("\n" + "-" * 60)
-print("ПОЛУЧЕНИЕ ОБНОВЛЕНИЙ:")
-print("-" * 60)
-
-response = requests.get(f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates")
+    sys.stderr.write(_MISSING_TOKEN_MSG)
+    raise SystemExit(1)
+
+EQ60 = "=" * 60
+DASH60 = "-" * 60
+
+# Весь статический баннер пишем одним вызовом вместо ~15 отдельных print
+BANNER = f"""{EQ60}
+📱 ПОЛУЧЕНИЕ CHAT ID ДЛЯ TELEGRAM БОТА
+{EQ60}
+
+⚠️ ВАЖНО: Chat ID - это НЕ ID бота!
+   Chat ID - это ID вашего личного чата или канала
+
+{DASH60}
+ИНСТРУКЦИЯ:
+{DASH60}
+
+1. Откройте Telegram
+2. Найдите вашего бота (поиск по имени бота)
+3. Напишите боту ЛЮБОЕ сообщение (например: /start или 'Привет')
+4. Затем запустите этот скрипт снова
+
+{DASH60}
+ПОЛУЧЕНИЕ ОБНОВЛЕНИЙ:
+{DASH60}
+"""
+
+# Шаблон вывода выбирается по типу чата из таблицы, без цепочки if/elif
+_CHAT_TEMPLATES = {
+    'private': "  👤 ЛИЧНЫЙ ЧАТ\n     Chat ID: {id}\n     Имя: {_name}\n{_uline}\n",
+    'group': "  👥 ГРУППА\n     Chat ID: {id}\n     Название: {title}\n\n",
+    'channel': "  📢 КАНАЛ\n     Chat ID: {id}\n     Название: {title}\n\n",
+}
+
+sys.stdout.write(BANNER)
+sys.stdout.flush()
+
+# Файл с offset'ом последнего обработанного обновления: повторные запуски
+# не перечитывают уже увиденные обновления (дедупликация на стороне Telegram)
+OFFSET_FILE = '.tg_offset'
+
+
+def _load_offset():
+    try:
+        with open(OFFSET_FILE, 'r') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _save_offset(offset):
+    try:
+        with open(OFFSET_FILE, 'w') as f:
+            f.write(str(offset))
+    except OSError:
+        pass  # состояние не критично
+
+
+# Long polling: одним запросом ждём обновления до 25 секунд вместо
+# мгновенного пустого ответа; offset сдвигаем, чтобы не перечитывать
+# уже обработанные обновления
+def fetch_updates():
+    """Получение обновлений через long polling (до 3 попыток ожидания)."""
+    offset = _load_offset()
+    data = {}
+    updates = []
+    for _ in range(3):
+        # Для поиска chat_id достаточно 10 обновлений — меньше байт на ответ
+        params = {"timeout": 25, "limit": 10, "allowed_updates": '["message"]'}
+        if offset is not None:
+            params["offset"] = offset
+        # Read timeout выше серверного timeout=25, чтобы не оборвать ожидание
+        response = SESSION.get(UPDATES_URL, params=params, timeout=(3.05, 30))
+        if response.status_code != 200:
+            return response, {}, []
+        data = _json_loads(response.content)
+        if not data.get('ok'):
+            return response, data, []
+        updates = data.get('result', [])
+        if updates:
+            # Сдвигаем offset за максимальный update_id, чтобы следующий
+            # запуск не получил эти обновления повторно
+            max_uid = max(u['update_id'] for u in updates)
+            _save_offset(max_uid + 1)
+            break
+        # Пустой ответ — продолжаем ждать следующую порцию обновлений
+    return response, data, updates
+
+response, data, updates = fetch_updates()
 if response.status_code == 200:
-    data = response.json()
     if data.get('ok'):
-        updates = data.get('result', [])
         if updates:
-            print("\n✅ Найденные чаты:\n")
-            seen_chats = set()
+            # Один проход по обновлениям: dict сохраняет порядок вставки
+            # и сам отбрасывает дубликаты чатов
+            chats = {}
             for update in updates:
-                if 'message' in update:
-                    chat = update['message']['chat']
-                    chat_id = chat['id']
-                    if chat_id not in seen_chats:
-                        seen_chats.add(chat_id)
-                        chat_type = chat.get('type', 'unknown')
-                        if chat_type == 'private':
-                            name = chat.get('first_name', '') + ' ' + (chat.get('last_name', '') or '')
-                            username = chat.get('username', '')
-                            print(f"  👤 ЛИЧНЫЙ ЧАТ")
-                            print(f"     Chat ID: {chat_id}")
-                            print(f"     Имя: {name.strip() or 'Не указано'}")
-                            if username:
-                                print(f"     Username: @{username}")
-                            print()
-                        elif chat_type == 'group':
-                            print(f"  👥 ГРУППА")
-                            print(f"     Chat ID: {chat_id}")
-                            print(f"     Название: {chat.get('title', 'Не указано')}")
-                            print()
-                        elif chat_type == 'channel':
-                            print(f"  📢 КАНАЛ")
-                            print(f"     Chat ID: {chat_id}")
-                            print(f"     Название: {chat.get('title', 'Не указано')}")
-                            print()
-            
-            if seen_chats:
-                print("-" * 60)
-                print("✅ ИСПОЛЬЗУЙТЕ ОДИН ИЗ ЭТИХ CHAT ID:")
-                print("-" * 60)
-                for chat_id in seen_chats:
-                    print(f"export TELEGRAM_CHAT_ID=\"{chat_id}\"")
-                print("\nИли обновите файл .env:")
-                print(f"TELEGRAM_CHAT_ID={list(seen_chats)[0]}")
+                message = update.get('message')
+                if message:
+                    chat = message['chat']
+                    chats.setdefault(chat['id'], chat)
+
+            # Копим вывод в список и пишем в stdout одним вызовом
+            out = ["\n✅ Найденные чаты:\n\n"]
+            append = out.append
+            for chat_id, chat in chats.items():
+                # Локальная привязка метода: один поиск атрибута на чат
+                g = chat.get
+                template = _CHAT_TEMPLATES.get(g('type', 'unknown'))
+                if template is None:
+                    continue
+                name = (g('first_name', '') + ' ' + (g('last_name') or '')).strip() or 'Не указано'
+                username = g('username', '')
+                append(template.format_map({
+                    'id': chat_id,
+                    'title': g('title', 'Не указано'),
+                    '_name': name,
+                    '_uline': f"     Username: @{username}\n" if username else "",
+                }))
+
+            if chats:
+                out.append(f"{DASH60}\n")
+                out.append("✅ ИСПОЛЬЗУЙТЕ ОДИН ИЗ ЭТИХ CHAT ID:\n")
+                out.append(f"{DASH60}\n")
+                for chat_id in chats:
+                    out.append(f"export TELEGRAM_CHAT_ID=\"{chat_id}\"\n")
+                out.append("\nИли обновите файл .env:\n")
+                out.append(f"TELEGRAM_CHAT_ID={next(iter(chats))}\n")
             else:
-                print("\n⚠️ Сообщений не найдено.")
+                out.append("\n⚠️ Сообщений не найдено.\n")
+            sys.stdout.write("".join(out))
+            sys.stdout.flush()
         else:
-            print("\n⚠️ Сообщений не найдено.")
-            print("\n📝 ДЕЙСТВИЯ:")
-            print("   1. Откройте Telegram")
-            print("   2. Найдите вашего бота")
-            print("   3. Напишите ему любое сообщение")
-            print("   4. Запустите этот скрипт снова")
+            sys.stdout.write(
+                "\n⚠️ Сообщений не найдено.\n"
+                "\n📝 ДЕЙСТВИЯ:\n"
+                "   1. Откройте Telegram\n"
+                "   2. Найдите вашего бота\n"
+                "   3. Напишите ему любое сообщение\n"
+                "   4. Запустите этот скрипт снова\n"
+            )
     else:
         print(f"\n❌ Ошибка API: {data}")
 else:
@@ -4,9 +4,14 @@
 на различных площадках
 """
 
+import functools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional
 import time
@@ -20,7 +25,89 @@ try:
 except ImportError:
     pass
 
+# lxml (есть в requirements.txt) парсит HTML в разы быстрее встроенного
+# html.parser; откатываемся на него, только если lxml не установлен
+try:
+    import lxml  # noqa: F401
+    BS_PARSER = 'lxml'
+except ImportError:
+    BS_PARSER = 'html.parser'
+
+# Brotli сжимает JSON-выдачу HH заметно лучше gzip, но рекламируем его
+# серверу, только если установлен пакет для распаковки
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    _ACCEPT_ENCODING = 'gzip, deflate'
+
+# Быстрый JSON-парсер, если установлен (orjson/ujson), иначе стандартный json
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    try:
+        from ujson import loads as _json_loads
+    except ImportError:
+        _json_loads = json.loads
+
+# Сериализация результатов: orjson пишет UTF-8 байты напрямую и заметно
+# быстрее стандартного json.dump; формат файла (indent=2) сохраняем
+try:
+    import orjson as _orjson
+
+    def _json_dump_bytes(obj) -> bytes:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_dump_bytes(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+# Ключевые слова для отбора вакансий, скомпилированные один раз на модуль:
+# один проход регулярного выражения вместо перебора списка подстрок на каждый вызов
+_PM_PATTERN = re.compile(r'product|продакт|\bpm\b|\bpo\b', re.IGNORECASE)
+_EXCLUDE_PATTERN = re.compile(r'project|проект|program\s?manager|программный менеджер', re.IGNORECASE)
+_PRODUCT_PATTERN = re.compile(r'product|продакт', re.IGNORECASE)
+
+# Паттерны парсинга зарплаты и опыта из строк, скомпилированные один раз:
+# парсеры вызываются на каждую вакансию в цикле фильтрации
+# Один проход по строке вместо трёх отдельных: диапазон "X-Y",
+# "от X" или просто первое число
+_RE_SALARY = re.compile(
+    r'(?P<range_from>\d+)\s*-\s*\d+|от\s*(?P<from>\d+)|(?P<num>\d+)',
+    re.IGNORECASE
+)
+# Все формы ("от 3 лет", "3+ лет", "3 года", "3 год") покрываются одним
+# паттерном — одно сканирование строки вместо пяти
+_RE_EXPERIENCE = re.compile(r'(?:от\s+)?(\d+)\+?\s+(?:лет|года|год)')
+
+@functools.lru_cache(maxsize=1024)
+def _parse_experience_from_string(experience_str: str) -> Optional[int]:
+    """Парсинг опыта из строки (например, 'от 3 лет', '3+ лет')"""
+    if not experience_str:
+        return None
+
+    # Ищем паттерны типа "от 3 лет", "3+ лет", "3 года";
+    # группа — это \d+, так что int() не может упасть
+    match = _RE_EXPERIENCE.search(experience_str.lower())
+    if match:
+        return int(match.group(1))
+    return None
+
+
+# Соответствие ID опыта HH API минимальному числу лет (берём нижнюю границу)
+_EXPERIENCE_MAP = {
+    'noExperience': 0,
+    'between1And3': 1,
+    'between3And6': 3,
+    'moreThan6': 6
+}
+
 class ProductManagerVacancyFinder:
+    # Предикат для поиска заголовка вакансии в HTML: один объект на класс,
+    # чтобы не создавать новое замыкание на каждую итерацию парсинга
+    _TITLE_CLASS_PREDICATE = staticmethod(
+        lambda x: x and ('title' in x.lower() or 'name' in x.lower())
+    )
+
     def __init__(self, min_salary: Optional[int] = None, min_experience_years: Optional[int] = None, max_vacancies: Optional[int] = None):
         """
         Инициализация поисковика вакансий
@@ -31,8 +118,30 @@ class ProductManagerVacancyFinder:
             max_vacancies: Максимальное количество вакансий для вывода (по умолчанию 10)
         """
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            # Явно просим сжатый ответ: страница выдачи HH — это ~200KB JSON
+            'Accept-Encoding': _ACCEPT_ENCODING,
+            # JSON приоритетно (HH API), но HTML тоже принимаем (карьерные сайты)
+            'Accept': 'application/json, text/html;q=0.9, */*;q=0.8'
         }
+        # Одна сессия на все запросы: переиспользуем TCP/TLS-соединения
+        # (hh.ru опрашивается десятки раз за прогон) + ретраи на 429/5xx
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        ))
+        # Не больше 5 одновременных запросов к HH API
+        self._hh_semaphore = threading.Semaphore(5)
+        # Сырые items последнего прогона search_hh_ru: поиски по конкретным
+        # работодателям фильтруют их вместо повторных запросов к HH
+        self._hh_raw_items = []
         self.vacancies = []
         
         # Загружаем фильтры из переменных окружения или параметров
@@ -51,6 +160,16 @@ class ProductManagerVacancyFinder:
             print("ℹ️  Применяется заданный фильтр")
         print(f"📊 Максимальное количество вакансий: {self.max_vacancies}\n")
     
+    def close(self):
+        """Закрытие HTTP-сессии"""
+        self.session.close()
+
+    def __del__(self):
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
     def _get_int_env(self, key: str) -> Optional[int]:
         """Получение целочисленной переменной окружения"""
         value = os.getenv(key)
@@ -63,31 +182,55 @@ class ProductManagerVacancyFinder:
     
     def _is_product_manager_vacancy(self, title: str) -> bool:
         """Проверка, является ли вакансия Product Manager"""
-        title_lower = title.lower()
-        pm_keywords = [
-            'product manager', 'продакт менеджер', 'продакт-менеджер', 
-            'product owner', 'продакт оунер', 'продакт-оунер',
-            'product lead', 'продакт лид', 'продакт-лид',
-            'product', 'продакт', 'pm', 'po'
-        ]
-        exclude_keywords = [
-            'project manager', 'проект менеджер', 'проект-менеджер',
-            'project', 'проект', 'программный менеджер', 'program manager'
-        ]
-        
         # Проверяем наличие ключевых слов Product Manager
-        has_pm = any(keyword in title_lower for keyword in pm_keywords)
-        
-        # Исключаем Project Manager (если нет упоминания Product)
-        has_exclude = any(keyword in title_lower for keyword in exclude_keywords)
-        
-        if has_pm:
-            # Если есть исключающие слова, проверяем, что есть явное упоминание Product
-            if has_exclude:
-                return 'product' in title_lower or 'продакт' in title_lower
-            return True
-        return False
+        if not _PM_PATTERN.search(title):
+            return False
+        # Исключаем Project Manager: если есть исключающие слова,
+        # требуем явное упоминание Product
+        if _EXCLUDE_PATTERN.search(title):
+            return _PRODUCT_PATTERN.search(title) is not None
+        return True
     
+    def _build_vacancy(self, item: Dict, source: str, default_company: str = '',
+                       default_location: str = '') -> Dict:
+        """Сборка словаря вакансии из item HH API (единый формат для всех поисков)"""
+        salary_data = item.get('salary')
+        experience_data = item.get('experience', {})
+        return {
+            'title': item.get('name', ''),
+            'company': item.get('employer', {}).get('name', default_company),
+            'location': item.get('area', {}).get('name', default_location),
+            'salary': self._format_salary(salary_data),
+            # Для фильтрации достаточно границ вилки; полный словарь HH
+            # (from/to/currency/gross) не храним
+            'salary_from': salary_data.get('from') if salary_data else None,
+            'salary_to': salary_data.get('to') if salary_data else None,
+            'experience': experience_data.get('id'),
+            'experience_name': experience_data.get('name', ''),
+            'url': item.get('alternate_url', ''),
+            'source': source,
+            'published': item.get('published_at', '')
+        }
+
+    def _fetch_hh_page(self, url: str, base_params: Dict, page: int) -> List[Dict]:
+        """Загрузка одной страницы выдачи HH API (ограничена семафором)"""
+        params = dict(base_params, page=page)
+        with self._hh_semaphore:
+            response = self.session.get(url, params=params, timeout=10)
+            # Адаптивное торможение: пауза только когда квота HH почти
+            # исчерпана, а не фиксированный sleep между всеми страницами
+            remaining = response.headers.get('X-RateLimit-Remaining')
+            if remaining is not None:
+                try:
+                    if int(remaining) < 5:
+                        time.sleep(1)
+                except ValueError:
+                    pass
+        if response.status_code != 200:
+            print(f"   ⚠️  Ошибка при запросе страницы {page + 1}: статус {response.status_code}")
+            return []
+        return _json_loads(response.content).get('items', [])
+
     def search_hh_ru(self) -> List[Dict]:
         """Поиск вакансий на HeadHunter с пагинацией"""
         print("🔍 Поиск на hh.ru...")
@@ -95,82 +238,92 @@ class ProductManagerVacancyFinder:
         try:
             # HH API endpoint
             url = "https://api.hh.ru/vacancies"
-            
+
             # Определяем, сколько вакансий нужно собрать (берем больше для фильтрации)
             # Если max_vacancies не задан, собираем до 200 вакансий для фильтрации
             target_count = max(200, self.max_vacancies * 5) if self.max_vacancies else 200
-            
+
             # Максимум страниц для запроса (HH API обычно дает до 2000 результатов = 20 страниц по 100)
             max_pages = min(20, (target_count // 100) + 1)
             per_page = 100  # Максимум для HH API
-            
+
             print(f"   📄 Будет запрошено до {max_pages} страниц (по {per_page} вакансий на страницу)")
-            
-            for page in range(max_pages):
-                params = {
-                    'text': 'Product Manager OR Продакт менеджер OR Product Owner OR Продакт оунер',
-                    'area': ['1', '2'],  # Москва и Санкт-Петербург
-                    'per_page': per_page,
-                    'page': page
-                }
-                
-                response = requests.get(url, params=params, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    items = data.get('items', [])
-                    
-                    if not items:
-                        print(f"   ℹ️  Страница {page + 1}: нет вакансий, завершаю поиск")
-                        break
-                    
-                    found_on_page = 0
-                    for item in items:
-                        title = item.get('name', '')
-                        # Фильтруем только Product Manager вакансии
-                        if self._is_product_manager_vacancy(title):
-                            # Получаем данные о зарплате и опыте
-                            salary_data = item.get('salary')
-                            experience_data = item.get('experience', {})
-                            
-                            vacancy = {
-                                'title': title,
-                                'company': item.get('employer', {}).get('name', ''),
-                                'location': item.get('area', {}).get('name', ''),
-                                'salary': self._format_salary(salary_data),
-                                'salary_data': salary_data,  # Сохраняем сырые данные для фильтрации
-                                'experience': experience_data.get('id'),  # Сохраняем ID опыта
-                                'experience_name': experience_data.get('name', ''),  # Название опыта
-                                'url': item.get('alternate_url', ''),
-                                'source': 'hh.ru',
-                                'published': item.get('published_at', '')
-                            }
-                            vacancies.append(vacancy)
-                            found_on_page += 1
-                    
-                    print(f"   📄 Страница {page + 1}: найдено {found_on_page} подходящих вакансий (всего собрано: {len(vacancies)})")
-                    
-                    # Проверяем, достигли ли нужного количества
-                    if len(vacancies) >= target_count:
+
+            base_params = {
+                'text': 'Product Manager OR Продакт менеджер OR Product Owner OR Продакт оунер',
+                'area': ['1', '2'],  # Москва и Санкт-Петербург
+                'per_page': per_page,
+            }
+
+            # Сколько вакансий, уже прошедших фильтры, достаточно, чтобы
+            # перестать запрашивать новые страницы (с запасом в 1.5 раза)
+            needed = int(self.max_vacancies * 1.5) if self.max_vacancies else target_count
+            allow_no_salary = self.min_salary is not None and self.min_experience_years is not None
+
+            def _passes_filters(vacancy: Dict) -> bool:
+                """Проходит ли вакансия заданные фильтры (для счётчика остановки)"""
+                if self.min_salary and not self._check_salary_filter(vacancy, allow_no_salary=allow_no_salary):
+                    return False
+                if self.min_experience_years and not self._check_experience_filter(vacancy):
+                    return False
+                return True
+
+            qualified = 0  # счётчик вакансий, прошедших все фильтры
+
+            # Локальные привязки методов для горячего цикла по items:
+            # один поиск атрибута вместо поиска на каждый из ~2000 элементов
+            is_pm = self._is_product_manager_vacancy
+            build_vacancy = self._build_vacancy
+            append_vacancy = vacancies.append
+
+            def _collect(items: List[Dict]) -> None:
+                """Отбор Product Manager вакансий из страницы выдачи"""
+                nonlocal qualified
+                for item in items:
+                    if is_pm(item.get('name', '')):
+                        vacancy = build_vacancy(item, 'hh.ru')
+                        append_vacancy(vacancy)
+                        if _passes_filters(vacancy):
+                            qualified += 1
+
+            # Первая страница синхронно: из неё узнаём реальное число страниц
+            response = self.session.get(url, params=dict(base_params, page=0), timeout=10)
+            if response.status_code != 200:
+                print(f"   ⚠️  Ошибка при запросе страницы 1: статус {response.status_code}")
+                return vacancies
+            data = _json_loads(response.content)
+            all_items = list(data.get('items', []))
+            pages = data.get('pages', 0)
+            found = data.get('found', 0)
+            max_pages = min(max_pages, pages)
+            _collect(all_items)
+
+            # Остальные страницы запрашиваем параллельно пачками по ширине
+            # пула; между пачками проверяем, не собрано ли уже достаточно
+            # прошедших фильтры вакансий — тогда оставшиеся страницы не нужны
+            page = 1
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                while page < max_pages and all_items:
+                    if qualified >= needed or len(vacancies) >= target_count:
                         print(f"   ✅ Собрано достаточно вакансий ({len(vacancies)}), завершаю поиск")
                         break
-                    
-                    # Проверяем, есть ли еще страницы
-                    pages = data.get('pages', 0)
-                    found = data.get('found', 0)
-                    if page + 1 >= pages:
-                        print(f"   ℹ️  Достигнут конец результатов (всего найдено на HH: {found})")
-                        break
-                    
-                    # Задержка между запросами, чтобы не перегружать API
-                    if page < max_pages - 1:
-                        time.sleep(0.5)
+                    batch_end = min(page + 8, max_pages)
+                    for items in executor.map(
+                        lambda p: self._fetch_hh_page(url, base_params, p),
+                        range(page, batch_end)
+                    ):
+                        all_items.extend(items)
+                        _collect(items)
+                    page = batch_end
                 else:
-                    print(f"   ⚠️  Ошибка при запросе страницы {page + 1}: статус {response.status_code}")
-                    break
-                    
+                    if max_pages >= pages:
+                        print(f"   ℹ️  Достигнут конец результатов (всего найдено на HH: {found})")
+
+            self._hh_raw_items = all_items
+
         except Exception as e:
             print(f"❌ Ошибка при поиске на hh.ru: {e}")
-        
+
         print(f"   ✅ Всего собрано с hh.ru: {len(vacancies)} вакансий")
         return vacancies
     
@@ -185,9 +338,9 @@ class ProductManagerVacancyFinder:
                 'q': 'Product Manager Продакт менеджер',
                 'p': 1
             }
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = BeautifulSoup(response.content, BS_PARSER)
                 # Парсинг структуры Авито (требует адаптации под актуальную структуру)
                 items = soup.find_all('div', class_='iva-item-content')[:10]
                 for item in items:
@@ -198,7 +351,8 @@ class ProductManagerVacancyFinder:
                             'company': 'Не указано',
                             'location': 'Не указано',
                             'salary': 'Не указано',
-                            'salary_data': None,
+                            'salary_from': None,
+                            'salary_to': None,
                             'experience': None,
                             'experience_name': '',
                             'url': 'https://www.avito.ru' + (item.find('a', href=True)['href'] if item.find('a', href=True) else ''),
@@ -220,9 +374,9 @@ class ProductManagerVacancyFinder:
                 'q': 'Product Manager Продакт менеджер',
                 'type': 'all'
             }
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = BeautifulSoup(response.content, BS_PARSER)
                 # Парсинг структуры Habr (требует адаптации)
                 # Берем больше для фильтрации (в 2-3 раза больше, чем нужно)
                 items_limit = max(50, self.max_vacancies * 5) if self.max_vacancies else 50
@@ -238,7 +392,8 @@ class ProductManagerVacancyFinder:
                                 'company': 'Не указано',
                                 'location': 'Не указано',
                                 'salary': 'Не указано',
-                                'salary_data': None,
+                                'salary_from': None,
+                                'salary_to': None,
                                 'experience': None,
                                 'experience_name': '',
                                 'url': 'https://career.habr.com' + title_elem.get('href', ''),
@@ -255,349 +410,163 @@ class ProductManagerVacancyFinder:
             print(f"❌ Ошибка при поиске на Habr Career: {e}")
         return vacancies
     
-    def search_sber(self) -> List[Dict]:
-        """Поиск вакансий на карьерном сайте Сбера"""
-        print("🔍 Поиск на Сбер (career.sber.ru)...")
+    def _filter_hh_items_by_employer(self, employer_markers: List[str], default_company: str,
+                                     source: str, limit: int = 5) -> List[Dict]:
+        """
+        Отбор вакансий конкретного работодателя из уже загруженных items HH
+        (search_hh_ru), без дополнительных запросов к API
+        """
         vacancies = []
-        
-        # Сначала пробуем через HH API - это более надежный способ
+        for item in self._hh_raw_items:
+            title = item.get('name', '')
+            employer_name = item.get('employer', {}).get('name', '').lower()
+            if self._is_product_manager_vacancy(title) and any(m in employer_name for m in employer_markers):
+                vacancies.append(self._build_vacancy(item, source, default_company, 'Москва'))
+                if len(vacancies) >= limit:
+                    break
+        return vacancies
+
+    def _scrape_career_site(self, urls: List[str], selectors: List[tuple], base_host: str,
+                            company: str, source: str, limit: int = 5) -> List[Dict]:
+        """
+        Общий парсинг карьерного сайта (Сбер/Т-Банк/Aviasales):
+        перебор URL и селекторов до первого успешного варианта
+        """
+        vacancies = []
+        title_class = self._TITLE_CLASS_PREDICATE
         try:
-            hh_url = "https://api.hh.ru/vacancies"
-            search_queries = [
-                {'text': 'Product Manager Сбер', 'per_page': 10},
-                {'text': 'Продакт менеджер Сбербанк', 'per_page': 10},
-                {'text': 'Product Manager', 'employer_id': '3529'},  # ID Сбера на HH
-            ]
-            
-            for params in search_queries:
-                if 'per_page' not in params:
-                    params['per_page'] = 10
-                response = requests.get(hh_url, params=params, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    for item in data.get('items', []):
-                        title = item.get('name', '')
-                        employer_name = item.get('employer', {}).get('name', '').lower()
-                        # Проверяем, что это действительно Сбер
-                        if self._is_product_manager_vacancy(title) and ('сбер' in employer_name or 'sber' in employer_name or 'сбербанк' in employer_name):
-                            salary_data = item.get('salary')
-                            experience_data = item.get('experience', {})
-                            vacancy = {
+            for base_url in urls:
+                try:
+                    response = self.session.get(base_url, timeout=10)
+                    if response.status_code != 200:
+                        continue
+                    soup = BeautifulSoup(response.content, BS_PARSER)
+                    for tag, attrs in selectors:
+                        items = soup.find_all(tag, attrs)
+                        if not items:
+                            continue
+                        for item in items:
+                            title_elem = item.find(['h2', 'h3', 'a', 'span'], class_=title_class)
+                            if not title_elem:
+                                title_elem = item.find(['h2', 'h3', 'a'])
+                            if not title_elem:
+                                continue
+                            title = title_elem.get_text(strip=True)
+                            if not self._is_product_manager_vacancy(title):
+                                continue
+                            link = item.find('a', href=True)
+                            url = link['href'] if link else base_url
+                            if not url.startswith('http'):
+                                url = f"{base_host}{url}" if url.startswith('/') else f"{base_url}/{url}"
+                            vacancies.append({
                                 'title': title,
-                                'company': item.get('employer', {}).get('name', 'Сбер'),
-                                'location': item.get('area', {}).get('name', 'Москва'),
-                                'salary': self._format_salary(salary_data),
-                                'salary_data': salary_data,
-                                'experience': experience_data.get('id'),
-                                'experience_name': experience_data.get('name', ''),
-                                'url': item.get('alternate_url', ''),
-                                'source': 'hh.ru (Сбер)',
-                                'published': item.get('published_at', '')
-                            }
-                            vacancies.append(vacancy)
-                            if len(vacancies) >= 5:
-                                break
-                    if vacancies:
-                        break
+                                'company': company,
+                                'location': 'Москва',
+                                'salary': 'Не указано',
+                                'salary_from': None,
+                                'salary_to': None,
+                                'experience': None,
+                                'experience_name': '',
+                                'url': url,
+                                'source': source,
+                                'published': datetime.now().isoformat()
+                            })
+                            if len(vacancies) >= limit:
+                                return vacancies
+                        if vacancies:
+                            return vacancies
+                except Exception:
+                    continue
         except Exception as e:
-            print(f"   ⚠️  Ошибка поиска через HH API: {e}")
-        
+            print(f"   ⚠️  Ошибка при парсинге сайта {company}: {e}")
+        return vacancies
+
+    def search_sber(self) -> List[Dict]:
+        """Поиск вакансий на карьерном сайте Сбера"""
+        print("🔍 Поиск на Сбер (career.sber.ru)...")
+        # Фильтруем уже загруженную выдачу HH вместо трёх отдельных запросов
+        vacancies = self._filter_hh_items_by_employer(
+            ['сбер', 'sber', 'сбербанк'], 'Сбер', 'hh.ru (Сбер)'
+        )
+
         # Если не нашли через HH, пробуем парсинг сайта
         if not vacancies:
-            try:
-                # Пробуем несколько вариантов URL
-                urls = [
-                    "https://career.sber.ru/vacancies",
-                    "https://sberbank.ru/careers/vacancies",
-                    "https://www.sberbank.ru/careers/vacancies"
-                ]
-                
-                for base_url in urls:
-                    try:
-                        # Пробуем поиск через API или парсинг
-                        search_url = f"{base_url}?query=Product Manager"
-                        response = requests.get(search_url, headers=self.headers, timeout=10)
-                        
-                        if response.status_code == 200:
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            
-                            # Различные возможные селекторы для вакансий
-                            selectors = [
-                                ('div', {'class': 'vacancy-item'}),
-                                ('div', {'class': 'vacancy-card'}),
-                                ('a', {'class': 'vacancy-link'}),
-                                ('div', {'data-vacancy': True}),
-                            ]
-                            
-                            for tag, attrs in selectors:
-                                items = soup.find_all(tag, attrs)
-                                if items:
-                                    for item in items:
-                                        title_elem = item.find(['h2', 'h3', 'a', 'span'], class_=lambda x: x and ('title' in x.lower() or 'name' in x.lower()))
-                                        if not title_elem:
-                                            title_elem = item.find(['h2', 'h3', 'a'])
-                                        
-                                        if title_elem:
-                                            title = title_elem.get_text(strip=True)
-                                            if self._is_product_manager_vacancy(title):
-                                                link = item.find('a', href=True)
-                                                url = link['href'] if link else base_url
-                                                if not url.startswith('http'):
-                                                    url = f"https://career.sber.ru{url}" if url.startswith('/') else f"{base_url}/{url}"
-                                                
-                                                vacancy = {
-                                                    'title': title,
-                                                    'company': 'Сбер',
-                                                    'location': 'Москва',
-                                                    'salary': 'Не указано',
-                                                    'salary_data': None,
-                                                    'experience': None,
-                                                    'experience_name': '',
-                                                    'url': url,
-                                                    'source': 'career.sber.ru',
-                                                    'published': datetime.now().isoformat()
-                                                }
-                                                vacancies.append(vacancy)
-                                                if len(vacancies) >= 5:
-                                                    break
-                                    if vacancies:
-                                        break
-                            if vacancies:
-                                break
-                    except Exception as e:
-                        continue
-            except Exception as e:
-                print(f"   ⚠️  Ошибка при парсинге сайта Сбера: {e}")
-                    
+            vacancies = self._scrape_career_site(
+                urls=[
+                    "https://career.sber.ru/vacancies?query=Product Manager",
+                    "https://sberbank.ru/careers/vacancies?query=Product Manager",
+                    "https://www.sberbank.ru/careers/vacancies?query=Product Manager"
+                ],
+                selectors=[
+                    ('div', {'class': 'vacancy-item'}),
+                    ('div', {'class': 'vacancy-card'}),
+                    ('a', {'class': 'vacancy-link'}),
+                    ('div', {'data-vacancy': True}),
+                ],
+                base_host="https://career.sber.ru",
+                company='Сбер',
+                source='career.sber.ru'
+            )
+
         return vacancies
     
     def search_tinkoff(self) -> List[Dict]:
         """Поиск вакансий на карьерном сайте Т-Банка (Tinkoff)"""
         print("🔍 Поиск на Т-Банк (Tinkoff)...")
-        vacancies = []
-        
-        # Сначала пробуем через HH API
-        try:
-            hh_url = "https://api.hh.ru/vacancies"
-            search_queries = [
-                {'text': 'Product Manager Tinkoff', 'per_page': 10},
-                {'text': 'Продакт менеджер Тинькофф', 'per_page': 10},
-                {'text': 'Product Manager', 'employer_id': '78638'},  # ID Tinkoff на HH
-            ]
-            
-            for params in search_queries:
-                if 'per_page' not in params:
-                    params['per_page'] = 10
-                response = requests.get(hh_url, params=params, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    for item in data.get('items', []):
-                        title = item.get('name', '')
-                        employer_name = item.get('employer', {}).get('name', '').lower()
-                        # Проверяем, что это действительно Tinkoff
-                        if self._is_product_manager_vacancy(title) and ('tinkoff' in employer_name or 'тинькофф' in employer_name or 't-банк' in employer_name):
-                            salary_data = item.get('salary')
-                            experience_data = item.get('experience', {})
-                            vacancy = {
-                                'title': title,
-                                'company': item.get('employer', {}).get('name', 'Т-Банк (Tinkoff)'),
-                                'location': item.get('area', {}).get('name', 'Москва'),
-                                'salary': self._format_salary(salary_data),
-                                'salary_data': salary_data,
-                                'experience': experience_data.get('id'),
-                                'experience_name': experience_data.get('name', ''),
-                                'url': item.get('alternate_url', ''),
-                                'source': 'hh.ru (Tinkoff)',
-                                'published': item.get('published_at', '')
-                            }
-                            vacancies.append(vacancy)
-                            if len(vacancies) >= 5:
-                                break
-                    if vacancies:
-                        break
-        except Exception as e:
-            print(f"   ⚠️  Ошибка поиска через HH API: {e}")
-        
+        # Фильтруем уже загруженную выдачу HH вместо трёх отдельных запросов
+        vacancies = self._filter_hh_items_by_employer(
+            ['tinkoff', 'тинькофф', 'т-банк'], 'Т-Банк (Tinkoff)', 'hh.ru (Tinkoff)'
+        )
+
         # Если не нашли через HH, пробуем парсинг сайта
         if not vacancies:
-            try:
-                # Пробуем несколько вариантов URL
-                urls = [
+            vacancies = self._scrape_career_site(
+                urls=[
                     "https://www.tinkoff.ru/career/vacancies/",
                     "https://jobs.tinkoff.ru/",
                     "https://www.tinkoff.ru/career/"
-                ]
-                
-                for base_url in urls:
-                    try:
-                        response = requests.get(base_url, headers=self.headers, timeout=10)
-                        
-                        if response.status_code == 200:
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            
-                            # Различные возможные селекторы
-                            selectors = [
-                                ('div', {'class': 'vacancy'}),
-                                ('div', {'class': 'vacancy-card'}),
-                                ('a', {'class': 'vacancy-link'}),
-                                ('div', {'class': 'job-item'}),
-                            ]
-                            
-                            for tag, attrs in selectors:
-                                items = soup.find_all(tag, attrs)
-                                if items:
-                                    for item in items:
-                                        title_elem = item.find(['h2', 'h3', 'a', 'span'], class_=lambda x: x and ('title' in x.lower() or 'name' in x.lower()))
-                                        if not title_elem:
-                                            title_elem = item.find(['h2', 'h3', 'a'])
-                                        
-                                        if title_elem:
-                                            title = title_elem.get_text(strip=True)
-                                            if self._is_product_manager_vacancy(title):
-                                                link = item.find('a', href=True)
-                                                url = link['href'] if link else base_url
-                                                if not url.startswith('http'):
-                                                    url = f"https://www.tinkoff.ru{url}" if url.startswith('/') else f"{base_url}/{url}"
-                                                
-                                                vacancy = {
-                                                    'title': title,
-                                                    'company': 'Т-Банк (Tinkoff)',
-                                                    'location': 'Москва',
-                                                    'salary': 'Не указано',
-                                                    'salary_data': None,
-                                                    'experience': None,
-                                                    'experience_name': '',
-                                                    'url': url,
-                                                    'source': 'tinkoff.ru',
-                                                    'published': datetime.now().isoformat()
-                                                }
-                                                vacancies.append(vacancy)
-                                                if len(vacancies) >= 5:
-                                                    break
-                                    if vacancies:
-                                        break
-                            if vacancies:
-                                break
-                    except Exception as e:
-                        continue
-            except Exception as e:
-                print(f"   ⚠️  Ошибка при парсинге сайта Т-Банка: {e}")
-                    
+                ],
+                selectors=[
+                    ('div', {'class': 'vacancy'}),
+                    ('div', {'class': 'vacancy-card'}),
+                    ('a', {'class': 'vacancy-link'}),
+                    ('div', {'class': 'job-item'}),
+                ],
+                base_host="https://www.tinkoff.ru",
+                company='Т-Банк (Tinkoff)',
+                source='tinkoff.ru'
+            )
+
         return vacancies
     
     def search_aviasales(self) -> List[Dict]:
         """Поиск вакансий на карьерном сайте Aviasales"""
         print("🔍 Поиск на Aviasales...")
-        vacancies = []
-        
-        # Сначала пробуем через HH API
-        try:
-            hh_url = "https://api.hh.ru/vacancies"
-            search_queries = [
-                {'text': 'Product Manager Aviasales', 'per_page': 10},
-                {'text': 'Продакт менеджер Авиасейлс', 'per_page': 10},
-                {'text': 'Product Manager', 'employer_id': '1455'},  # Aviasales (примерный ID)
-            ]
-            
-            for params in search_queries:
-                if 'per_page' not in params:
-                    params['per_page'] = 10
-                response = requests.get(hh_url, params=params, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    for item in data.get('items', []):
-                        title = item.get('name', '')
-                        employer_name = item.get('employer', {}).get('name', '').lower()
-                        # Проверяем, что это действительно Aviasales
-                        if self._is_product_manager_vacancy(title) and ('aviasales' in employer_name or 'авиасейлс' in employer_name):
-                            salary_data = item.get('salary')
-                            experience_data = item.get('experience', {})
-                            vacancy = {
-                                'title': title,
-                                'company': item.get('employer', {}).get('name', 'Aviasales'),
-                                'location': item.get('area', {}).get('name', 'Москва'),
-                                'salary': self._format_salary(salary_data),
-                                'salary_data': salary_data,
-                                'experience': experience_data.get('id'),
-                                'experience_name': experience_data.get('name', ''),
-                                'url': item.get('alternate_url', ''),
-                                'source': 'hh.ru (Aviasales)',
-                                'published': item.get('published_at', '')
-                            }
-                            vacancies.append(vacancy)
-                            if len(vacancies) >= 5:
-                                break
-                    if vacancies:
-                        break
-        except Exception as e:
-            print(f"   ⚠️  Ошибка поиска через HH API: {e}")
-        
+        # Фильтруем уже загруженную выдачу HH вместо трёх отдельных запросов
+        vacancies = self._filter_hh_items_by_employer(
+            ['aviasales', 'авиасейлс'], 'Aviasales', 'hh.ru (Aviasales)'
+        )
+
         # Если не нашли через HH, пробуем парсинг сайта
         if not vacancies:
-            try:
-                # Пробуем несколько вариантов URL
-                urls = [
+            vacancies = self._scrape_career_site(
+                urls=[
                     "https://careers.aviasales.ru/",
                     "https://www.aviasales.ru/jobs",
                     "https://aviasales.ru/careers"
-                ]
-                
-                for base_url in urls:
-                    try:
-                        response = requests.get(base_url, headers=self.headers, timeout=10)
-                        
-                        if response.status_code == 200:
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            
-                            # Различные возможные селекторы
-                            selectors = [
-                                ('div', {'class': 'vacancy'}),
-                                ('div', {'class': 'vacancy-card'}),
-                                ('a', {'class': 'vacancy-link'}),
-                                ('div', {'class': 'job-item'}),
-                                ('div', {'class': 'position'}),
-                            ]
-                            
-                            for tag, attrs in selectors:
-                                items = soup.find_all(tag, attrs)
-                                if items:
-                                    for item in items:
-                                        title_elem = item.find(['h2', 'h3', 'a', 'span'], class_=lambda x: x and ('title' in x.lower() or 'name' in x.lower()))
-                                        if not title_elem:
-                                            title_elem = item.find(['h2', 'h3', 'a'])
-                                        
-                                        if title_elem:
-                                            title = title_elem.get_text(strip=True)
-                                            if self._is_product_manager_vacancy(title):
-                                                link = item.find('a', href=True)
-                                                url = link['href'] if link else base_url
-                                                if not url.startswith('http'):
-                                                    url = f"https://careers.aviasales.ru{url}" if url.startswith('/') else f"{base_url}/{url}"
-                                                
-                                                vacancy = {
-                                                    'title': title,
-                                                    'company': 'Aviasales',
-                                                    'location': 'Москва',
-                                                    'salary': 'Не указано',
-                                                    'salary_data': None,
-                                                    'experience': None,
-                                                    'experience_name': '',
-                                                    'url': url,
-                                                    'source': 'aviasales.ru',
-                                                    'published': datetime.now().isoformat()
-                                                }
-                                                vacancies.append(vacancy)
-                                                if len(vacancies) >= 5:
-                                                    break
-                                    if vacancies:
-                                        break
-                            if vacancies:
-                                break
-                    except Exception as e:
-                        continue
-            except Exception as e:
-                print(f"   ⚠️  Ошибка при парсинге сайта Aviasales: {e}")
-                    
+                ],
+                selectors=[
+                    ('div', {'class': 'vacancy'}),
+                    ('div', {'class': 'vacancy-card'}),
+                    ('a', {'class': 'vacancy-link'}),
+                    ('div', {'class': 'job-item'}),
+                    ('div', {'class': 'position'}),
+                ],
+                base_host="https://careers.aviasales.ru",
+                company='Aviasales',
+                source='aviasales.ru'
+            )
+
         return vacancies
     
     def _format_salary(self, salary_data: Dict) -> str:
@@ -624,32 +593,13 @@ class ProductManagerVacancyFinder:
         # Убираем пробелы и запятые для парсинга
         clean_str = salary_str.replace(',', '').replace(' ', '')
         
-        # Ищем паттерны типа "250000-350000", "от 250000", "250000 - 350000"
-        # Сначала ищем диапазон
-        range_match = re.search(r'(\d+)\s*-\s*(\d+)', clean_str)
-        if range_match:
-            try:
-                # Берем первое число (минимальная зарплата)
-                return int(range_match.group(1))
-            except ValueError:
-                pass
-        
-        # Ищем "от X"
-        from_match = re.search(r'от\s*(\d+)', clean_str, re.IGNORECASE)
-        if from_match:
-            try:
-                return int(from_match.group(1))
-            except ValueError:
-                pass
-        
-        # Ищем просто числа
-        numbers = re.findall(r'\d+', clean_str)
-        if numbers:
-            # Берем первое число (минимальная зарплата)
-            try:
-                return int(numbers[0])
-            except ValueError:
-                return None
+        # Паттерны типа "250000-350000", "от 250000", "250000 - 350000"
+        # разбираются одним сканированием; в любом варианте берём
+        # первое число (минимальная зарплата)
+        # Захваченная группа — это \d+, так что int() не может упасть
+        match = _RE_SALARY.search(clean_str)
+        if match:
+            return int(match.group(match.lastgroup))
         return None
     
     def _get_experience_years_from_hh_id(self, experience_id: str) -> Optional[int]:
@@ -661,42 +611,7 @@ class ProductManagerVacancyFinder:
         - 'between3And6' = 3-6 лет (берем минимум 3)
         - 'moreThan6' = более 6 лет (берем минимум 6)
         """
-        if not experience_id:
-            return None
-        
-        experience_map = {
-            'noExperience': 0,
-            'between1And3': 1,
-            'between3And6': 3,
-            'moreThan6': 6
-        }
-        return experience_map.get(experience_id)
-    
-    def _parse_experience_from_string(self, experience_str: str) -> Optional[int]:
-        """Парсинг опыта из строки (например, 'от 3 лет', '3+ лет')"""
-        if not experience_str:
-            return None
-        
-        experience_str_lower = experience_str.lower()
-        
-        # Ищем паттерны типа "от 3 лет", "3+ лет", "3 года"
-        patterns = [
-            r'от\s+(\d+)\s+лет',
-            r'(\d+)\+\s+лет',
-            r'(\d+)\s+лет',
-            r'(\d+)\s+года',
-            r'(\d+)\s+год'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, experience_str_lower)
-            if match:
-                try:
-                    return int(match.group(1))
-                except ValueError:
-                    continue
-        
-        return None
+        return _EXPERIENCE_MAP.get(experience_id) if experience_id else None
     
     def _check_salary_filter(self, vacancy: Dict, allow_no_salary: bool = False) -> bool:
         """
@@ -709,15 +624,12 @@ class ProductManagerVacancyFinder:
         if not self.min_salary:
             return True  # Если фильтр не задан, считаем что проходит
         
-        # Проверяем сырые данные о зарплате
-        salary_data = vacancy.get('salary_data')
-        has_salary_data = False
-        
-        if salary_data:
-            has_salary_data = True
-            from_sal = salary_data.get('from')
-            to_sal = salary_data.get('to')
-            
+        # Проверяем границы вилки из HH (сохранены как примитивы)
+        from_sal = vacancy.get('salary_from')
+        to_sal = vacancy.get('salary_to')
+        has_salary_data = from_sal is not None or to_sal is not None
+
+        if has_salary_data:
             # Если есть минимальная зарплата - проверяем её
             if from_sal is not None:
                 if from_sal >= self.min_salary:
@@ -770,17 +682,18 @@ class ProductManagerVacancyFinder:
         # Парсим из строки названия опыта
         experience_name = vacancy.get('experience_name', '')
         if experience_name:
-            parsed_experience = self._parse_experience_from_string(experience_name)
+            parsed_experience = _parse_experience_from_string(experience_name)
             if parsed_experience is not None and parsed_experience >= self.min_experience_years:
                 return True
-        
-        # Парсим из описания вакансии (если есть)
+
+        # Парсим из описания вакансии (если есть); требуемый опыт обычно
+        # указан в начале — первых 500 символов достаточно
         description = vacancy.get('description', '')
         if description:
-            parsed_experience = self._parse_experience_from_string(description)
+            parsed_experience = _parse_experience_from_string(description[:500])
             if parsed_experience is not None and parsed_experience >= self.min_experience_years:
                 return True
-        
+
         return False
     
     def _apply_filters(self, vacancies: List[Dict]) -> List[Dict]:
@@ -794,32 +707,31 @@ class ProductManagerVacancyFinder:
         filtered = []
         rejected_by_salary = 0
         rejected_by_experience = 0
-        rejected_by_both = 0
-        
+
         # Если заданы оба фильтра, разрешаем вакансии без зарплаты, если они подходят по опыту
         allow_no_salary = (self.min_salary is not None and self.min_experience_years is not None)
-        
+
+        # Инварианты цикла — в локальные переменные: без повторных поисков
+        # атрибутов на каждую вакансию
+        min_salary = self.min_salary
+        min_experience = self.min_experience_years
+        check_salary = self._check_salary_filter
+        check_experience = self._check_experience_filter
+
         for vacancy in vacancies:
-            # Проверяем все заданные фильтры
-            salary_match = True  # Если фильтр не задан, считаем что проходит
-            experience_match = True  # Если фильтр не задан, считаем что проходит
-            
-            if self.min_salary:
-                salary_match = self._check_salary_filter(vacancy, allow_no_salary=allow_no_salary)
-                if not salary_match:
-                    rejected_by_salary += 1
-            
-            if self.min_experience_years:
-                experience_match = self._check_experience_filter(vacancy)
-                if not experience_match:
-                    rejected_by_experience += 1
-            
+            # Фильтр по зарплате первым: он дешёвый (сравнение примитивов),
+            # и его отказ окончателен — regex-проверки опыта уже не нужны
+            if min_salary and not check_salary(vacancy, allow_no_salary=allow_no_salary):
+                rejected_by_salary += 1
+                continue
+
+            if min_experience and not check_experience(vacancy):
+                rejected_by_experience += 1
+                continue
+
             # Вакансия проходит, если удовлетворяет ВСЕМ заданным фильтрам (И)
             # Но если заданы оба фильтра, вакансия без зарплаты проходит, если подходит по опыту
-            if salary_match and experience_match:
-                filtered.append(vacancy)
-            elif not salary_match and not experience_match:
-                rejected_by_both += 1
+            filtered.append(vacancy)
         
         # Выводим статистику отсева
         if self.min_salary or self.min_experience_years:
@@ -830,8 +742,6 @@ class ProductManagerVacancyFinder:
                     print(f"      - по зарплате: {rejected_by_salary}")
                 if self.min_experience_years and rejected_by_experience > 0:
                     print(f"      - по опыту: {rejected_by_experience}")
-                if rejected_by_both > 0:
-                    print(f"      - по обоим фильтрам: {rejected_by_both}")
         
         return filtered
     
@@ -841,31 +751,37 @@ class ProductManagerVacancyFinder:
         print(f"📋 Ищу вакансии на hh.ru и career.habr.com (максимум: {self.max_vacancies})\n")
         
         all_vacancies = []
-        
-        # Поиск на hh.ru - берем 10 вакансий
-        print("=" * 60)
-        hh_vacancies = self.search_hh_ru()
-        print(f"✅ Найдено {len(hh_vacancies)} вакансий на hh.ru")
-        all_vacancies.extend(hh_vacancies)
-        time.sleep(1)  # Задержка между запросами
-        
-        # Поиск на career.habr.com - берем 10 вакансий
+
+        # Площадки независимы — опрашиваем их параллельно, итоговое время
+        # равно самому медленному источнику, а не сумме
         print("=" * 60)
-        habr_vacancies = self.search_habr_career()
-        print(f"✅ Найдено {len(habr_vacancies)} вакансий на career.habr.com")
-        all_vacancies.extend(habr_vacancies)
-        
+        searches = [
+            ('hh.ru', self.search_hh_ru),
+            ('career.habr.com', self.search_habr_career),
+        ]
+        with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+            futures = [(name, executor.submit(search)) for name, search in searches]
+            for name, future in futures:
+                try:
+                    found = future.result()
+                except Exception as e:
+                    # Ошибка одной площадки не должна ронять остальные
+                    print(f"❌ Ошибка при поиске на {name}: {e}")
+                    continue
+                print(f"✅ Найдено {len(found)} вакансий на {name}")
+                all_vacancies.extend(found)
+
         print("=" * 60)
         print(f"\n📊 Всего собрано: {len(all_vacancies)} вакансий")
         
-        # Убираем дубликаты по URL
-        seen_urls = set()
-        unique_vacancies = []
+        # Убираем дубликаты по URL: dict сохраняет порядок вставки и
+        # оставляет первое вхождение — одна хеш-операция на вакансию
+        unique_map = {}
         for vacancy in all_vacancies:
-            if vacancy['url'] not in seen_urls:
-                seen_urls.add(vacancy['url'])
-                unique_vacancies.append(vacancy)
-        
+            unique_map.setdefault(vacancy['url'], vacancy)
+        unique_vacancies = list(unique_map.values())
+
+
         if len(unique_vacancies) < len(all_vacancies):
             print(f"🔄 После удаления дубликатов: {len(unique_vacancies)} вакансий")
         
@@ -908,8 +824,8 @@ class ProductManagerVacancyFinder:
     
     def save_to_json(self, filename: str = 'product_manager_vacancies.json'):
         """Сохранение результатов в JSON"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.vacancies, f, ensure_ascii=False, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(_json_dump_bytes(self.vacancies))
         print(f"\n💾 Результаты сохранены в {filename}")
 
 
@@ -5,12 +5,19 @@
 """
 
 import argparse
+import functools
+import hashlib
 import json
 import os
+import re
 import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional
+from urllib3.util.retry import Retry
 
 # Загрузка переменных из .env файла (если есть)
 try:
@@ -26,24 +33,86 @@ VACANCIES_FILE = 'product_manager_vacancies.json'
 # Максимальный возраст вакансий в днях при отправке без --refresh (только свежие)
 MAX_DAYS_OLD_DEFAULT = 3
 
-
+# Быстрый JSON-парсер, если установлен (orjson/ujson), иначе стандартный json
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    try:
+        from ujson import loads as _json_loads
+    except ImportError:
+        _json_loads = json.loads
+
+# Удаление HTML-тегов из описания: компилируем один раз на модуль
+_RE_HTML_TAG = re.compile(r'<[^>]+>')
+
+# Извлечение ID вакансии из ссылки hh.ru одним совпадением вместо
+# цепочки split'ов с промежуточными списками
+_RE_HH_ID = re.compile(r'hh\.ru/vacancy/(\d+)')
+
+# Технологии/подходы для сопроводительного письма: один проход регулярным
+# выражением по описанию вместо 12 отдельных поисков подстрок
+_TECH_KEYWORDS = ('agile', 'scrum', 'kanban', 'b2b', 'b2c', 'saas', 'api',
+                  'ux', 'ui', 'analytics', 'метрики', 'аналитика')
+_RE_TECH = re.compile('|'.join(map(re.escape, _TECH_KEYWORDS)))
+
+# Одна сессия на процесс: TCP/TLS-соединения к api.telegram.org и
+# api.hh.ru переиспользуются вместо нового handshake на каждый запрос
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # По умолчанию urllib3 не ретраит POST — а sendMessage именно POST.
+        # Разрешаем POST только для connect- и status-ретраев: там ответ
+        # либо не отправлялся, либо уже получен, дубля сообщения не будет.
+        # read=0 выключает ретрай после таймаута чтения — Telegram мог
+        # успеть обработать запрос, повтор продублировал бы сообщение
+        connect=3,
+        read=0,
+        status=3,
+        allowed_methods=frozenset({'GET', 'POST'}),
+        respect_retry_after_header=True
+    )
+))
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+
+# Минимальный интервал между стартами отправок в один чат: лимит
+# Telegram — порядка 1 сообщения в секунду на чат, держимся чуть ниже
+_SEND_INTERVAL = 1.05
+_send_lock = threading.Lock()
+_next_send_at = 0.0
+
+
+def _acquire_send_slot():
+    """Выдержать паузу до следующего слота отправки (token bucket)."""
+    global _next_send_at
+    with _send_lock:
+        now = time.monotonic()
+        slot = max(now, _next_send_at)
+        _next_send_at = slot + _SEND_INTERVAL
+    delay = slot - now
+    if delay > 0:
+        time.sleep(delay)
+
+
+@functools.lru_cache(maxsize=512)
 def get_vacancy_description(vacancy_url: str) -> Optional[str]:
-    """Получение описания вакансии из HH API"""
+    """Получение описания вакансии из HH API (повторные URL — из кеша)"""
     try:
-        if 'hh.ru/vacancy/' in vacancy_url:
-            vacancy_id = vacancy_url.split('/vacancy/')[-1].split('?')[0]
-            api_url = f"https://api.hh.ru/vacancies/{vacancy_id}"
+        hh_match = _RE_HH_ID.search(vacancy_url)
+        if hh_match:
+            api_url = f"https://api.hh.ru/vacancies/{hh_match.group(1)}"
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(api_url, headers=headers, timeout=10)
+            response = SESSION.get(api_url, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 description = data.get('description', '')
-                import re
-                description = re.sub(r'<[^>]+>', '', description)
+                description = _RE_HTML_TAG.sub('', description)
                 return description[:2000]
     except Exception as e:
         print(f"⚠️ Ошибка при получении описания: {e}")
@@ -54,11 +123,9 @@ def generate_cover_letter(vacancy_title: str, company: str, description: str) ->
     """Генерация сопроводительного письма"""
     keywords = []
     if description:
-        desc_lower = description.lower()
-        tech_keywords = ['agile', 'scrum', 'kanban', 'b2b', 'b2c', 'saas', 'api', 'ux', 'ui', 'analytics', 'метрики', 'аналитика']
-        for keyword in tech_keywords:
-            if keyword in desc_lower:
-                keywords.append(keyword)
+        # Находим все ключевые слова одним сканированием и убираем дубликаты
+        # с сохранением порядка появления
+        keywords = list(dict.fromkeys(_RE_TECH.findall(description.lower())))
     
     letter = f"""Здравствуйте!
 
@@ -81,17 +148,19 @@ def generate_cover_letter(vacancy_title: str, company: str, description: str) ->
 
 def format_vacancy_message(vacancy: Dict) -> str:
     """Форматирование сообщения о вакансии"""
-    message = f"""🎯 <b>{vacancy['title']}</b>
+    # Одна распаковка в локальные переменные вместо шести поисков по dict
+    title, company, location, salary, url, source = (
+        vacancy[k] for k in ('title', 'company', 'location', 'salary', 'url', 'source')
+    )
+    return f"""🎯 <b>{title}</b>
 
-🏢 Компания: {vacancy['company']}
-📍 Локация: {vacancy['location']}
-💰 Зарплата: {vacancy['salary']}
-🔗 Ссылка: {vacancy['url']}
-📅 Источник: {vacancy['source']}
+🏢 Компания: {company}
+📍 Локация: {location}
+💰 Зарплата: {salary}
+🔗 Ссылка: {url}
+📅 Источник: {source}
 
 ❓ <b>Необходимо ли составить сопроводительное письмо?</b>"""
-    
-    return message
 
 
 def send_message_with_buttons(text: str, buttons: List[List[Dict]]) -> bool:
@@ -110,7 +179,7 @@ def send_message_with_buttons(text: str, buttons: List[List[Dict]]) -> bool:
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = SESSION.post(url, json=payload, timeout=10)
         if response.status_code == 200:
             return True
         else:
@@ -143,13 +212,14 @@ def send_cover_letter(vacancy: Dict, cover_letter: str) -> bool:
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = SESSION.post(url, json=payload, timeout=10)
         return response.status_code == 200
     except Exception as e:
         print(f"❌ Ошибка при отправке письма: {e}")
         return False
 
 
+@functools.lru_cache(maxsize=2048)
 def _parse_published_date(published_str: str) -> Optional[datetime]:
     """Извлечь дату публикации из строки (ISO или HH format)."""
     if not published_str:
@@ -164,14 +234,11 @@ def _parse_published_date(published_str: str) -> Optional[datetime]:
         return None
 
 
-def _is_vacancy_within_days(vacancy: Dict, max_days: int) -> bool:
-    """Проверить, что вакансия опубликована не более max_days дней назад."""
-    if max_days is None or max_days <= 0:
-        return True
+def _is_vacancy_within_limit(vacancy: Dict, limit) -> bool:
+    """Проверить, что вакансия опубликована не раньше даты limit."""
     pub = _parse_published_date(vacancy.get('published', ''))
     if pub is None:
         return True  # без даты не отфильтровываем
-    limit = datetime.now().date() - timedelta(days=max_days)
     return pub.date() >= limit
 
 
@@ -191,30 +258,35 @@ def refresh_vacancies_file() -> bool:
 def load_vacancies(max_days_old: Optional[int] = None) -> List[Dict]:
     """Загрузка вакансий из JSON. Если задан max_days_old — только за последние N дней."""
     try:
-        with open(VACANCIES_FILE, 'r', encoding='utf-8') as f:
-            vacancies = json.load(f)
+        with open(VACANCIES_FILE, 'rb') as f:
+            vacancies = _json_loads(f.read())
     except FileNotFoundError:
         print(f"❌ Файл {VACANCIES_FILE} не найден")
         return []
-    except json.JSONDecodeError:
+    except ValueError:
         print(f"❌ Ошибка при чтении {VACANCIES_FILE}")
         return []
 
     if max_days_old is not None and max_days_old > 0:
-        filtered = [v for v in vacancies if _is_vacancy_within_days(v, max_days_old)]
+        # Дата-граница инвариантна для всего списка — считаем её один раз,
+        # а не через datetime.now() на каждую вакансию
+        limit = datetime.now().date() - timedelta(days=max_days_old)
+        filtered = [v for v in vacancies if _is_vacancy_within_limit(v, limit)]
         if len(filtered) < len(vacancies):
             print(f"📅 Отобрано вакансий за последние {max_days_old} дн.: {len(filtered)} из {len(vacancies)}")
         return filtered
     return vacancies
 
 
+@functools.lru_cache(maxsize=1024)
 def get_vacancy_id(vacancy_url: str) -> str:
     """Извлечение ID вакансии из URL для callback_data"""
     try:
-        if 'hh.ru/vacancy/' in vacancy_url:
-            return vacancy_url.split('/vacancy/')[-1].split('?')[0]
-        # Для других источников используем хеш
-        import hashlib
+        hh_match = _RE_HH_ID.search(vacancy_url)
+        if hh_match:
+            return hh_match.group(1)
+        # Для других источников используем хеш; md5 намеренно — бот
+        # сопоставляет callback_data, пересчитывая тот же md5-идентификатор
         return hashlib.md5(vacancy_url.encode()).hexdigest()[:16]
     except:
         return str(hash(vacancy_url))[:16]
@@ -250,14 +322,15 @@ def send_all_vacancies(refresh: bool = False, max_days_old: Optional[int] = MAX_
             print("❌ Нет вакансий для отправки")
         return
     
-    print(f"📤 Отправляю {len(vacancies)} вакансий...")
-    
-    for i, vacancy in enumerate(vacancies, 1):
+    total = len(vacancies)
+    print(f"📤 Отправляю {total} вакансий...")
+
+    def _send_one(vacancy: Dict) -> bool:
         message = format_vacancy_message(vacancy)
-        
+
         # Используем ID вместо полного URL (ограничение Telegram - 64 байта)
         vacancy_id = get_vacancy_id(vacancy['url'])
-        
+
         # Создаем кнопки
         buttons = [[
             {
@@ -269,14 +342,23 @@ def send_all_vacancies(refresh: bool = False, max_days_old: Optional[int] = MAX_
                 "callback_data": f"no_{vacancy_id}"
             }
         ]]
-        
-        if send_message_with_buttons(message, buttons):
-            print(f"✅ [{i}/{len(vacancies)}] Вакансия отправлена: {vacancy['title']} в {vacancy['company']}")
-        else:
-            print(f"❌ [{i}/{len(vacancies)}] Ошибка при отправке: {vacancy['title']}")
-        
-        time.sleep(1)  # Задержка между отправками
-    
+
+        # Пауза до свободного слота вместо фиксированного sleep(1):
+        # сетевые запросы идут внахлёст, лимит чата не нарушается
+        _acquire_send_slot()
+        return send_message_with_buttons(message, buttons)
+
+    # Отправки независимы — гоняем их через пул потоков, итоги печатаем
+    # в исходном порядке
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(_send_one, v) for v in vacancies]
+        for i, (vacancy, future) in enumerate(zip(vacancies, futures), 1):
+            title = vacancy['title']
+            if future.result():
+                print(f"✅ [{i}/{total}] Вакансия отправлена: {title} в {vacancy['company']}")
+            else:
+                print(f"❌ [{i}/{total}] Ошибка при отправке: {title}")
+
     print(f"\n✅ Все вакансии отправлены!")
 
 
@@ -4,18 +4,55 @@
 с возможностью генерации сопроводительного письма
 """
 
+import functools
+import gzip
+import hashlib
 import json
+import logging
 import os
 import re
 import requests
+import traceback
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
+from bs4 import BeautifulSoup
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes, MessageHandler, filters, JobQueue
 import asyncio
-import os
+import html
+import io
 import tempfile
+import time
+import zlib
 from datetime import datetime
 
+from ios_vacancies_finder import ProductManagerVacancyFinder
+
+# Быстрый JSON-парсер, если установлен (orjson/ujson), иначе стандартный json
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    try:
+        from ujson import loads as _json_loads
+    except ImportError:
+        _json_loads = json.loads
+
+# Быстрая сериализация: orjson отдаёт bytes сразу, иначе кодируем вручную
+try:
+    import orjson as _orjson
+
+    def _json_dump_bytes(obj) -> bytes:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_dump_bytes(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+# Отладочный лог горячих обработчиков: logging подставляет %s-аргументы
+# только если уровень включён, поэтому на INFO эти строки ничего не стоят
+logger = logging.getLogger(__name__)
+
 # Загрузка переменных из .env файла (если есть)
 try:
     from dotenv import load_dotenv
@@ -42,11 +79,264 @@ VACANCIES_FILE = 'product_manager_vacancies.json'
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')  # Опционально, для генерации письма
 HH_ACCESS_TOKEN = os.getenv('HH_ACCESS_TOKEN', '')  # Токен доступа к HH API для откликов
 
-# Перезагружаем переменные после загрузки .env
-if not TELEGRAM_BOT_TOKEN:
-    TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
-if not TELEGRAM_CHAT_ID:
-    TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID', '')
+# Одна HTTP-сессия на процесс: пул соединений к api.hh.ru вместо нового
+# TCP/TLS-handshake на каждый запрос; ретраи только на временные ошибки
+# (POST не ретраится — отклик не должен уйти дважды)
+_HTTP_SESSION = requests.Session()
+# User-Agent задаётся один раз на сессию: запросы не собирают словарь
+# заголовков на каждый вызов
+_HTTP_SESSION.headers['User-Agent'] = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+_HTTP_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+    )
+))
+
+# Регулярные выражения, скомпилированные один раз на модуль: извлечение
+# данных из резюме прогоняет ~25 паттернов на каждый загруженный файл
+_WS_RE = re.compile(r'\s+')
+_CLEAN_RE = re.compile(r'[^\w\s\-/()]')
+_DIGITS_ONLY_RE = re.compile(r'^[\d\s\-\+\(\)]+$')
+_TITLE_LINE_RE = re.compile(r'^[А-Яа-яA-Za-z\s\-]+$')
+_HAS_DIGIT_RE = re.compile(r'\d')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Паттерны для поиска должности (расширенный список)
+_POSITION_PATTERNS = tuple(re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+    # Основные паттерны с "желаемая"
+    r'желаемая\s+должность[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'желаемая\s+позиция[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'желаемая\s+работа[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'желаемая\s+вакансия[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+
+    # Паттерны без "желаемая"
+    r'должность[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'позиция[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'профессия[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+
+    # Английские варианты
+    r'desired\s+position[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'desired\s+job[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'position[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'job\s+title[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'target\s+position[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+
+    # Цель/Objective
+    r'цель[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'objective[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'career\s+objective[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+
+    # Специфичные для резюме форматы
+    r'ищу\s+работу\s+на\s+позицию[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'ищу\s+позицию[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'looking\s+for[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+))
+
+# Ключевые слова требований по категориям: вместо O(слов x длина текста)
+# отдельных поисков подстрок описание сканируется одним проходом
+# объединённого регулярного выражения
+_REQUIREMENT_CATEGORIES = (
+    # Технологии и инструменты
+    (('agile', 'scrum', 'kanban', 'lean'), 'Методологии разработки'),
+    (('jira', 'confluence', 'notion', 'figma', 'miro'), 'Инструменты'),
+    (('sql', 'python', 'javascript', 'java', 'swift', 'kotlin'), 'Языки программирования'),
+    (('api', 'rest', 'graphql', 'microservices'), 'Архитектура'),
+    (('aws', 'azure', 'gcp', 'docker', 'kubernetes'), 'Инфраструктура'),
+    (('analytics', 'метрики', 'аналитика', 'bi', 'tableau'), 'Аналитика'),
+    (('ux', 'ui', 'дизайн', 'design'), 'Дизайн'),
+    (('a/b тест', 'ab тест', 'a/b testing'), 'Тестирование'),
+    (('b2b', 'b2c', 'saas', 'marketplace'), 'Бизнес-модели'),
+
+    # Навыки и компетенции
+    (('roadmap', 'дорожная карта'), 'Планирование'),
+    (('backlog', 'бэклог', 'приоритизация'), 'Управление задачами'),
+    (('stakeholder', 'стейкхолдер', 'коммуникация'), 'Коммуникации'),
+    (('метрики', 'kpi', 'okr', 'цели'), 'Метрики и цели'),
+    (('гипотеза', 'hypothesis', 'эксперимент'), 'Экспериментирование'),
+    (('юзер стори', 'user story', 'требования'), 'Работа с требованиями'),
+    (('анализ данных', 'data analysis', 'исследования'), 'Исследования'),
+    (('конкурентный анализ', 'competitive analysis'), 'Анализ рынка'),
+)
+
+def _fold(text: str) -> str:
+    """Нормализация текста для сопоставления: нижний регистр и ё -> е.
+
+    Обе замены сохраняют длину строки 1:1, поэтому индексы совпадений
+    остаются валидными для вырезания контекста из исходного текста
+    (casefold/NFKC этим свойством не обладают: ß -> ss, лигатуры).
+    """
+    return text.lower().replace('ё', 'е')
+
+
+# keyword -> список категорий (некоторые слова входят в несколько категорий);
+# ключи нормализуются той же свёрткой, что и сканируемый текст
+_REQ_KEYWORD_CATEGORIES = {}
+for _kws, _cat in _REQUIREMENT_CATEGORIES:
+    for _kw in _kws:
+        _REQ_KEYWORD_CATEGORIES.setdefault(_fold(_kw), []).append(_cat)
+
+# Длинные альтернативы первыми, чтобы пересекающиеся слова матчились целиком
+_REQ_SCAN_RE = re.compile('|'.join(
+    re.escape(kw) for kw in sorted(_REQ_KEYWORD_CATEGORIES, key=len, reverse=True)
+))
+
+
+# Слова, по которым строка резюме похожа на название должности:
+# одна альтернация вместо перебора списка подстрок для каждой строки
+_POSITION_KEYWORDS_RE = re.compile('|'.join((
+    'менеджер', 'manager', 'разработчик', 'developer',
+    'дизайнер', 'designer', 'аналитик', 'analyst',
+    'специалист', 'specialist', 'инженер', 'engineer',
+    'архитектор', 'architect', 'лид', 'lead',
+    'директор', 'director', 'руководитель', 'head',
+    'координатор', 'coordinator', 'консультант', 'consultant',
+)))
+
+# Слова резюме для проверки однословных ключевых слов по множеству
+_TOKEN_RE = re.compile(r'[a-zа-яё0-9+#]+')
+
+# ID вакансии hh.ru из URL: один поиск вместо пары split'ов
+_VAC_ID_RE = re.compile(r'hh\.ru/vacancy/([^?]+)')
+
+# Имя файла сохранённого резюме (свежие — с gzip-сжатием): user_id
+# извлекается одним матчем вместо цепочки replace/split
+_RESUME_FILE_RE = re.compile(r'resume_(\d+).*\.txt(?:\.gz)?$')
+
+# Фабрики inline-клавиатур: раскладка фиксирована, меняется только
+# callback_data, поэтому собранный markup кешируется по ID вакансии
+# и не пересоздаётся на каждую карточку в пачке
+
+
+@functools.lru_cache(maxsize=256)
+def _yesno_markup(vacancy_id: str) -> InlineKeyboardMarkup:
+    """Кнопки «Да/Нет» под карточкой вакансии"""
+    return InlineKeyboardMarkup([[
+        InlineKeyboardButton("✅ Да, составить", callback_data=f"yes_{vacancy_id}"),
+        InlineKeyboardButton("❌ Нет", callback_data=f"no_{vacancy_id}")
+    ]])
+
+
+@functools.lru_cache(maxsize=256)
+def _apply_markup(vacancy_id: str) -> InlineKeyboardMarkup:
+    """Кнопка «Откликнуться» под сопроводительным письмом"""
+    return InlineKeyboardMarkup([[
+        InlineKeyboardButton("📤 Откликнуться на вакансию", callback_data=f"apply_{vacancy_id}")
+    ]])
+
+
+# Кнопка «Отправить ещё» одинакова для всех сообщений — один объект на процесс
+_SEND_MORE_MARKUP = InlineKeyboardMarkup([[
+    InlineKeyboardButton("📤 Отправить ещё вакансии", callback_data="send_more")
+]])
+
+# Парсер HTML для BeautifulSoup: lxml токенизирует в разы быстрее
+# чистопитонного html.parser, если установлен
+try:
+    import lxml  # noqa: F401
+    _BS4_PARSER = 'lxml'
+except ImportError:
+    _BS4_PARSER = 'html.parser'
+
+
+@functools.lru_cache(maxsize=1024)
+def _vacancy_id_from_url(vacancy_url: str) -> str:
+    """ID вакансии для callback_data (с кешем: URL хешируется один раз).
+
+    Для не-hh источников остаётся md5[:16] — те же ID генерирует
+    send_vacancies_to_telegram.py, и они должны совпадать.
+    """
+    m = _VAC_ID_RE.search(vacancy_url)
+    if m:
+        return m.group(1)
+    return hashlib.md5(vacancy_url.encode()).hexdigest()[:16]
+
+
+# Причины недоступности OpenAI для подписи под шаблонным письмом
+_ERROR_DESCRIPTIONS = {
+    'no_api_key': 'API ключ OpenAI не установлен',
+    'import_error': 'Библиотека openai не установлена',
+    'initialization_error': 'Ошибка инициализации OpenAI клиента',
+    'region_forbidden': 'OpenAI недоступен в вашем регионе',
+    'unauthorized': 'Неверный API ключ OpenAI',
+    'rate_limit': 'Превышен лимит запросов к OpenAI',
+    'timeout': 'Таймаут при подключении к OpenAI',
+    'connection_error': 'Проблема с подключением к OpenAI',
+    'unknown_error': 'Ошибка при подключении к OpenAI'
+}
+
+# Известные ошибки Telegram ищутся одним проходом регулярного выражения
+# с именованными группами; подсказка выбирается по имени сработавшей группы
+_TG_ERROR_RE = re.compile(
+    r'(?P<timeout>Timed out|ConnectTimeout)'
+    r'|(?P<unauthorized>Unauthorized)'
+    r'|(?P<chat_not_found>Chat not found)'
+)
+_TG_ERROR_HINTS = {
+    'timeout': '⚠️ Таймаут подключения к Telegram. Проверьте интернет-соединение.',
+    'unauthorized': '⚠️ Неверный токен бота. Проверьте TELEGRAM_BOT_TOKEN.',
+    'chat_not_found': '⚠️ Чат не найден. Проверьте TELEGRAM_CHAT_ID.',
+}
+
+# Русские названия месяцев для дат публикации (кортеж строится один раз)
+_MONTHS_RU = ('января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
+              'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря')
+
+# Дата публикации в ISO: "2024-01-27T12:15:18+0300" или просто "2024-01-27"
+_ISO_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}):(\d{2}):(\d{2}))?')
+
+# Паттерны для поиска зарплаты
+_SALARY_PATTERNS = tuple(re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+    r'желаемая\s+зарплата[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'зарплата[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'зарплата\s+от[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'оклад[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'salary[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'desired\s+salary[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+    r'compensation[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
+))
+
+# Статические тексты меню и справки: строки склеиваются один раз при
+# импорте модуля, а не на каждый вызов команды
+_MENU_TEXT_PREFIX = (
+    "📋 <b>Меню бота</b>\n\n"
+    "Доступные функции:\n\n"
+    "📤 <b>Отправить вакансии</b> — подборка 30 свежих вакансий по дате (пачками по 10)\n"
+    "📄 <b>Резюме</b> - загрузить или посмотреть резюме\n"
+    "🗑️ <b>Очистить резюме</b> - удалить загруженное резюме\n"
+    "🔄 <b>Очистить отправленные</b> - очистить список отправленных вакансий\n"
+    "ℹ️ <b>Помощь</b> - показать справку\n"
+    "📋 <b>Меню</b> - показать это меню\n\n"
+)
+
+_HELP_TEXT = (
+    "ℹ️ <b>Справка по использованию бота</b>\n\n"
+    "<b>Основные команды:</b>\n"
+    "/start - запустить бота и показать приветствие\n"
+    "/send - подборка свежих вакансий (30 по дате, пачками по 10)\n"
+    "/menu - показать меню с кнопками\n"
+    "/help - показать эту справку\n\n"
+    "<b>Работа с резюме:</b>\n"
+    "/resume - загрузить резюме (файл или текст)\n"
+    "/clear_resume - удалить загруженное резюме\n\n"
+    "<b>Управление вакансиями:</b>\n"
+    "/clear_sent - очистить список отправленных вакансий\n\n"
+    "<b>Отправить вакансии:</b>\n"
+    "📤 Кнопка загружает 30 самых свежих вакансий (по дате: сегодня → вчера → позавчера…).\n"
+    "Сначала приходит 10 вакансий, внизу кнопка «Отправить ещё вакансии» — ещё по 10, всего до 30.\n\n"
+    "<b>Как использовать:</b>\n"
+    "1. Загрузите резюме командой /resume или через меню (должность подставится в поиск)\n"
+    "2. Нажмите «Отправить вакансии» — получите первую пачку из 10\n"
+    "3. Нажмите «Отправить ещё вакансии» для следующих 10 (до 30 в подборке)\n"
+    "4. Для каждой вакансии можно запросить сопроводительное письмо\n\n"
+    "💡 Используйте кнопки меню для быстрого доступа к функциям!"
+)
 
 
 class TelegramVacancyBot:
@@ -60,10 +350,16 @@ class TelegramVacancyBot:
         self.user_positions = {}  # Хранилище должностей: {user_id: position}
         self.user_subscriptions = {}  # Подписки пользователей: {user_id: {'position': str, 'active': bool}}
         self.fresh_vacancies = []  # Хранилище свежих вакансий за сегодня
+        self.fresh_vacancies_by_url = {}  # Индекс свежих вакансий: {url: vacancy}
+        self._today_urls = set()  # URL сегодняшних вакансий после последнего скана
+        self._scan_task = None  # Фоновая задача сканера (fallback без job_queue)
+        self._flush_task = None  # Фоновая задача сброса состояния (fallback)
+        self._bg_tasks = set()  # Ссылки на фоновые задачи (защита от сборщика мусора)
         self.user_sent_fresh_vacancies = {}  # Отслеживание отправленных свежих вакансий: {user_id: set(vacancy_urls)}
         self.user_fresh_batch = {}  # Подборка 30 свежих вакансий по дате: {user_id: {'vacancies': [...], 'offset': int}}
         self.resumes_dir = 'resumes'  # Директория для сохранения резюме
-        self.sent_vacancies_file = 'sent_vacancies.json'  # Файл для хранения отправленных вакансий
+        self.sent_vacancies_file = 'sent_vacancies.json'  # Снимок отправленных вакансий
+        self.sent_vacancies_log_file = 'sent_vacancies.log'  # Журнал дозаписи между снимками
         self.users_data_file = 'users_data.json'  # Файл для хранения данных пользователей
         self.fresh_vacancies_file = 'fresh_vacancies.json'  # Файл для хранения свежих вакансий
         self.user_sent_fresh_file = 'user_sent_fresh.json'  # Файл для отслеживания отправленных свежих вакансий
@@ -82,61 +378,132 @@ class TelegramVacancyBot:
         
         # Загружаем данные об отправленных свежих вакансиях пользователям
         self._load_user_sent_fresh()
-        
+
+        # Отложенная запись состояния: обработчики только помечают срез
+        # «грязным», на диск его скидывает периодическая задача (_flush_state)
+        self._dirty_state = set()
+        self._resume_parse_cache = {}  # Кеш разбора резюме: {hash(text): (должность, зарплата)}
+        self._lower_cache = {}  # Кеш нижнего регистра резюме: {hash(text): text.lower()}
+        self._token_cache = {}  # Кеш множеств слов резюме: {hash(text): frozenset}
+        self._vacancy_index = {}  # Обратный индекс {vacancy_id: вакансия} по файлу вакансий
+        self._vacancy_index_mtime = -1.0  # mtime файла, по которому построен индекс
+        self._vacancies_cache = []  # Разобранный список вакансий (load_vacancies)
+        self._vacancies_cache_mtime = -1.0  # mtime файла, по которому разобран список
+        self._hh_resume_id = None  # ID активного резюме на HH (кеш на время жизни токена)
+        self._hh_resume_id_ts = 0.0  # monotonic-время получения ID
+        self._hh_resume_id_ttl = 1800  # 30 минут
+        self._description_cache = {}  # Кеш описаний вакансий: {vacancy_id: (время, текст)}
+        self._description_cache_ttl = 1800  # 30 минут
+        self._openai_client = None  # Клиент OpenAI: создаётся один раз (лениво)
+        self._openai_legacy = False  # Установлена старая версия библиотеки openai
+        self._openai_init_error = None  # (тип, текст) ошибки инициализации, если была
+        self._openai_init_done = False
+        self._last_saved_digest = {}  # Контрольные суммы записанных срезов состояния
+        self._state_savers = {
+            'users': self._save_users_data,
+            'fresh': self._save_fresh_vacancies,
+            'user_sent_fresh': self._save_user_sent_fresh,
+        }
+
+        # Клавиатура меню неизменна — один объект на процесс
+        self._menu_keyboard = self._build_menu_keyboard()
+
+        # Кнопки меню -> обработчики: один поиск по словарю на сообщение
+        # вместо цепочки сравнений строк
+        self._menu_dispatch = {
+            "📤 Отправить вакансии": self.send_fresh_batch_command,
+            "📄 Резюме": self.resume_command,
+            "🗑️ Очистить резюме": self.clear_resume_command,
+            "🔄 Очистить отправленные": self.clear_sent_command,
+            "ℹ️ Помощь": self.help_command,
+            "📋 Меню": self.menu_command,
+        }
+
         # Периодическое сканирование будет запущено через post_init после создания приложения
         
     def load_vacancies(self) -> List[Dict]:
-        """Загрузка вакансий из JSON файла"""
+        """Загрузка вакансий из JSON файла (с кешем по mtime файла)"""
         try:
-            with open(self.vacancies_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # Тёплый путь: файл не менялся — отдаём уже разобранный список
+            # и не парсим JSON заново на каждый клик
+            mtime = os.path.getmtime(self.vacancies_file)
+            if mtime == self._vacancies_cache_mtime:
+                return self._vacancies_cache
+            with open(self.vacancies_file, 'rb') as f:
+                self._vacancies_cache = _json_loads(f.read())
+            self._vacancies_cache_mtime = mtime
+            return self._vacancies_cache
         except FileNotFoundError:
             print(f"❌ Файл {self.vacancies_file} не найден")
             return []
-        except json.JSONDecodeError:
+        except ValueError:
             print(f"❌ Ошибка при чтении {self.vacancies_file}")
             return []
     
+    @staticmethod
+    def _normalize_vacancy_url(vacancy_url: str) -> str:
+        """Нормализация URL вакансии (без query-параметров и хвостового /)"""
+        return vacancy_url.split('?')[0].rstrip('/')
+
     def _load_sent_vacancies(self) -> set:
-        """Загрузка списка отправленных вакансий (URL)"""
+        """Загрузка списка отправленных вакансий (снимок JSON + журнал дозаписи)"""
+        urls = set()
+        normalize = self._normalize_vacancy_url
         try:
             if os.path.exists(self.sent_vacancies_file):
-                with open(self.sent_vacancies_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return set(data.get('urls', []))
-            return set()
+                with open(self.sent_vacancies_file, 'rb') as f:
+                    data = _json_loads(f.read())
+                    # Нормализуем при загрузке: старые файлы могли содержать
+                    # URL с query-параметрами
+                    urls = {normalize(u) for u in data.get('urls', [])}
         except Exception as e:
             print(f"⚠️ Ошибка при загрузке списка отправленных вакансий: {e}")
-            return set()
-    
+        # Доигрываем журнал: URL, отправленные после последнего снимка
+        try:
+            if os.path.exists(self.sent_vacancies_log_file):
+                with open(self.sent_vacancies_log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            urls.add(normalize(line))
+                # Сливаем журнал в снимок и начинаем новый журнал
+                data = {
+                    'urls': list(urls),
+                    'last_updated': datetime.now().isoformat()
+                }
+                with open(self.sent_vacancies_file, 'wb') as f:
+                    f.write(_json_dump_bytes(data))
+                os.remove(self.sent_vacancies_log_file)
+        except Exception as e:
+            print(f"⚠️ Ошибка при чтении журнала отправленных вакансий: {e}")
+        return urls
+
     def _save_sent_vacancy(self, vacancy_url: str):
-        """Сохранение URL отправленной вакансии"""
+        """Сохранение URL отправленной вакансии (O(1) дозапись в журнал)"""
+        vacancy_url = self._normalize_vacancy_url(vacancy_url)
+        if vacancy_url in self.sent_vacancies:
+            return
         try:
             self.sent_vacancies.add(vacancy_url)
-            data = {
-                'urls': list(self.sent_vacancies),
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.sent_vacancies_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # Дозапись одной строки вместо перезаписи всего JSON-файла
+            with open(self.sent_vacancies_log_file, 'a', encoding='utf-8') as f:
+                f.write(vacancy_url + '\n')
         except Exception as e:
             print(f"⚠️ Ошибка при сохранении отправленной вакансии: {e}")
-    
+
     def _is_vacancy_sent(self, vacancy_url: str) -> bool:
         """Проверка, была ли вакансия уже отправлена"""
         if not vacancy_url:
             return False  # Вакансии без URL считаем новыми
-        # Нормализуем URL (убираем параметры запроса для сравнения)
-        normalized_url = vacancy_url.split('?')[0].rstrip('/')
-        original_url = vacancy_url.rstrip('/')
-        return normalized_url in self.sent_vacancies or original_url in self.sent_vacancies
+        # В наборе только нормализованные URL — достаточно одной проверки
+        return self._normalize_vacancy_url(vacancy_url) in self.sent_vacancies
     
     def _load_users_data(self):
         """Загрузка данных пользователей из файла"""
         try:
             if os.path.exists(self.users_data_file):
-                with open(self.users_data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.users_data_file, 'rb') as f:
+                    data = _json_loads(f.read())
                     self.user_positions = data.get('positions', {})
                     self.user_subscriptions = data.get('subscriptions', {})
                     # Конвертируем ключи в int
@@ -150,16 +517,35 @@ class TelegramVacancyBot:
             self.user_positions = {}
             self.user_subscriptions = {}
     
+    def _write_state_if_changed(self, name: str, path: str, payload: dict):
+        """Запись среза состояния на диск, только если содержимое изменилось.
+
+        Контрольная сумма считается по полезным данным (без last_updated),
+        чтобы не переписывать файл тем же содержимым байт в байт.
+        """
+        digest = zlib.crc32(_json_dump_bytes(payload))
+        if self._last_saved_digest.get(name) == digest:
+            return
+        payload['last_updated'] = datetime.now().isoformat()
+        # Запись через временный файл: отложенный сброс не должен
+        # оставить битый JSON при падении процесса посреди записи
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_json_dump_bytes(payload))
+        os.replace(tmp_path, path)
+        # Контрольную сумму запоминаем только после успешного replace:
+        # иначе неудачная запись помечала бы срез как «сохранённый»
+        # и следующие сбросы молча его пропускали бы
+        self._last_saved_digest[name] = digest
+
     def _save_users_data(self):
         """Сохранение данных пользователей в файл"""
         try:
-            data = {
+            payload = {
                 'positions': {str(k): v for k, v in self.user_positions.items()},
                 'subscriptions': {str(k): v for k, v in self.user_subscriptions.items()},
-                'last_updated': datetime.now().isoformat()
             }
-            with open(self.users_data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._write_state_if_changed('users', self.users_data_file, payload)
         except Exception as e:
             print(f"⚠️ Ошибка при сохранении данных пользователей: {e}")
     
@@ -167,14 +553,15 @@ class TelegramVacancyBot:
         """Загрузка свежих вакансий из файла"""
         try:
             if os.path.exists(self.fresh_vacancies_file):
-                with open(self.fresh_vacancies_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.fresh_vacancies_file, 'rb') as f:
+                    data = _json_loads(f.read())
                     self.fresh_vacancies = data.get('vacancies', [])
-                    # Фильтруем только сегодняшние вакансии
-                    today = datetime.now().date()
+                    # Фильтруем только сегодняшние вакансии: даты приходят в ISO,
+                    # поэтому достаточно сравнить строковый префикс YYYY-MM-DD
+                    today_iso = datetime.now().date().isoformat()
                     self.fresh_vacancies = [
-                        v for v in self.fresh_vacancies 
-                        if self._is_vacancy_from_today(v.get('published', ''), today)
+                        v for v in self.fresh_vacancies
+                        if v.get('published', '')[:10] == today_iso
                     ]
                     print(f"✅ Загружено {len(self.fresh_vacancies)} свежих вакансий за сегодня")
             else:
@@ -186,12 +573,8 @@ class TelegramVacancyBot:
     def _save_fresh_vacancies(self):
         """Сохранение свежих вакансий в файл"""
         try:
-            data = {
-                'vacancies': self.fresh_vacancies,
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.fresh_vacancies_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            payload = {'vacancies': self.fresh_vacancies}
+            self._write_state_if_changed('fresh', self.fresh_vacancies_file, payload)
         except Exception as e:
             print(f"⚠️ Ошибка при сохранении свежих вакансий: {e}")
     
@@ -199,8 +582,8 @@ class TelegramVacancyBot:
         """Загрузка данных об отправленных свежих вакансиях пользователям"""
         try:
             if os.path.exists(self.user_sent_fresh_file):
-                with open(self.user_sent_fresh_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.user_sent_fresh_file, 'rb') as f:
+                    data = _json_loads(f.read())
                     self.user_sent_fresh_vacancies = {
                         int(k): set(v) for k, v in data.get('user_sent', {}).items()
                     }
@@ -213,32 +596,52 @@ class TelegramVacancyBot:
     def _save_user_sent_fresh(self):
         """Сохранение данных об отправленных свежих вакансиях пользователям"""
         try:
-            data = {
+            payload = {
                 'user_sent': {
                     str(k): list(v) for k, v in self.user_sent_fresh_vacancies.items()
-                },
-                'last_updated': datetime.now().isoformat()
+                }
             }
-            with open(self.user_sent_fresh_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._write_state_if_changed('user_sent_fresh', self.user_sent_fresh_file, payload)
         except Exception as e:
             print(f"⚠️ Ошибка при сохранении отправленных свежих вакансий: {e}")
-    
+
+    def _mark_dirty(self, name: str):
+        """Пометить срез состояния для отложенной записи на диск"""
+        self._dirty_state.add(name)
+
+    def _flush_state(self):
+        """Сброс всех помеченных срезов состояния на диск"""
+        if not self._dirty_state:
+            return
+        dirty, self._dirty_state = self._dirty_state, set()
+        for name in dirty:
+            self._state_savers[name]()
+
+    async def _flush_state_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Периодический сброс состояния (callback для job_queue)"""
+        # Запись в отдельном потоке: event loop не блокируется на диске
+        await asyncio.to_thread(self._flush_state)
+
     def _is_vacancy_from_today(self, published_str: str, today_date=None) -> bool:
         """Проверка, опубликована ли вакансия сегодня"""
         try:
             if not published_str:
                 return False
-            
+
             if today_date is None:
                 today_date = datetime.now().date()
-            
-            # Парсим дату из формата ISO (например, "2024-01-27T12:15:18+0300")
+
+            # Быстрый путь: даты приходят в ISO ("2024-01-27T12:15:18+0300"),
+            # префикс YYYY-MM-DD сравнивается без strptime
+            if published_str[4:5] == '-' and published_str[10:11] == 'T':
+                return published_str[:10] == today_date.isoformat()
+
+            # Нестандартный формат — разбираем как раньше
             if 'T' in published_str:
                 date_str = published_str.split('T')[0]
                 vacancy_date = datetime.strptime(date_str, '%Y-%m-%d').date()
                 return vacancy_date == today_date
-            
+
             return False
         except Exception as e:
             print(f"⚠️ Ошибка при проверке даты вакансии: {e}")
@@ -251,53 +654,21 @@ class TelegramVacancyBot:
             print(f"📄 Длина текста резюме: {len(resume_text)} символов")
             
             # Нормализуем текст (заменяем множественные пробелы на одинарные)
-            resume_text_normalized = re.sub(r'\s+', ' ', resume_text)
-            
-            # Паттерны для поиска должности (расширенный список)
-            patterns = [
-                # Основные паттерны с "желаемая"
-                r'желаемая\s+должность[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'желаемая\s+позиция[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'желаемая\s+работа[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'желаемая\s+вакансия[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                
-                # Паттерны без "желаемая"
-                r'должность[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'позиция[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'профессия[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                
-                # Английские варианты
-                r'desired\s+position[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'desired\s+job[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'position[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'job\s+title[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'target\s+position[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                
-                # Цель/Objective
-                r'цель[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'objective[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'career\s+objective[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                
-                # Специфичные для резюме форматы
-                r'ищу\s+работу\s+на\s+позицию[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'ищу\s+позицию[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'looking\s+for[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-            ]
-            
-            # Ищем по паттернам
-            for i, pattern in enumerate(patterns):
-                matches = re.finditer(pattern, resume_text_normalized, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
+            resume_text_normalized = _WS_RE.sub(' ', resume_text)
+
+            # Ищем по заранее скомпилированным паттернам
+            for i, pattern in enumerate(_POSITION_PATTERNS):
+                for match in pattern.finditer(resume_text_normalized):
                     position = match.group(1).strip()
                     # Очищаем от лишних символов, но сохраняем основные
-                    position = re.sub(r'[^\w\s\-/()]', '', position).strip()
+                    position = _CLEAN_RE.sub('', position).strip()
                     # Убираем лишние пробелы
-                    position = re.sub(r'\s+', ' ', position).strip()
-                    
+                    position = _WS_RE.sub(' ', position).strip()
+
                     # Проверяем, что это не слишком коротко и не слишком длинно
                     if position and 3 <= len(position) <= 100:
                         # Проверяем, что это не похоже на email, телефон или другую информацию
-                        if not re.match(r'^[\d\s\-\+\(\)]+$', position):  # Не только цифры
+                        if not _DIGITS_ONLY_RE.match(position):  # Не только цифры
                             if '@' not in position:  # Не email
                                 print(f"✅ Должность найдена паттерном {i+1}: '{position}'")
                                 return position
@@ -310,18 +681,9 @@ class TelegramVacancyBot:
                 line = line.strip()
                 if line and 5 <= len(line) <= 80:  # Должность обычно короткая
                     # Проверяем, не похоже ли на должность (содержит ключевые слова)
-                    position_keywords = [
-                        'менеджер', 'manager', 'разработчик', 'developer', 
-                        'дизайнер', 'designer', 'аналитик', 'analyst',
-                        'специалист', 'specialist', 'инженер', 'engineer',
-                        'архитектор', 'architect', 'лид', 'lead',
-                        'директор', 'director', 'руководитель', 'head',
-                        'координатор', 'coordinator', 'консультант', 'consultant'
-                    ]
-                    line_lower = line.lower()
-                    if any(keyword in line_lower for keyword in position_keywords):
+                    if _POSITION_KEYWORDS_RE.search(line.lower()):
                         # Проверяем, что это не контактная информация
-                        if '@' not in line and not re.match(r'^[\d\s\-\+\(\)]+$', line):
+                        if '@' not in line and not _DIGITS_ONLY_RE.match(line):
                             print(f"✅ Должность найдена в строке {line_num+1}: '{line}'")
                             return line
             
@@ -331,7 +693,7 @@ class TelegramVacancyBot:
                 line = line.strip()
                 if line and 5 <= len(line) <= 80:
                     # Если строка содержит только буквы, пробелы и дефисы - возможно это должность
-                    if re.match(r'^[А-Яа-яA-Za-z\s\-]+$', line) and len(line.split()) <= 5:
+                    if _TITLE_LINE_RE.match(line) and len(line.split()) <= 5:
                         print(f"✅ Возможная должность в заголовке: '{line}'")
                         return line
             
@@ -339,33 +701,40 @@ class TelegramVacancyBot:
             return None
         except Exception as e:
             print(f"⚠️ Ошибка при извлечении должности: {e}")
-            import traceback
             traceback.print_exc()
             return None
     
+    def _parse_resume(self, resume_text: str):
+        """Должность и зарплата из резюме одним вызовом с кешем по тексту.
+
+        Повторная загрузка того же файла не прогоняет заново ~25 паттернов
+        по всему тексту — результат берётся из кеша.
+        """
+        key = hash(resume_text)
+        cached = self._resume_parse_cache.get(key)
+        if cached is not None:
+            return cached
+        parsed = (
+            self._extract_position_from_resume(resume_text),
+            self._extract_salary_from_resume(resume_text),
+        )
+        self._resume_parse_cache[key] = parsed
+        # Ограничиваем кеш: выбрасываем самый старый разобранный текст
+        if len(self._resume_parse_cache) > 256:
+            self._resume_parse_cache.pop(next(iter(self._resume_parse_cache)))
+        return parsed
+
     def _extract_salary_from_resume(self, resume_text: str) -> Optional[str]:
         """Извлечение желаемой зарплаты из резюме"""
         try:
             print("🔍 Начинаю извлечение зарплаты из резюме...")
             
-            # Паттерны для поиска зарплаты
-            patterns = [
-                r'желаемая\s+зарплата[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'зарплата[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'зарплата\s+от[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'оклад[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'salary[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'desired\s+salary[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-                r'compensation[:\s]*([^\n\r]+?)(?:\n|$|\.|;)',
-            ]
-            
-            # Ищем по паттернам
-            for pattern in patterns:
-                matches = re.finditer(pattern, resume_text, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
+            # Ищем по заранее скомпилированным паттернам
+            for pattern in _SALARY_PATTERNS:
+                for match in pattern.finditer(resume_text):
                     salary = match.group(1).strip()
                     # Проверяем, что это похоже на зарплату (содержит цифры)
-                    if re.search(r'\d', salary):
+                    if _HAS_DIGIT_RE.search(salary):
                         print(f"✅ Зарплата найдена: '{salary}'")
                         return salary
             
@@ -381,11 +750,10 @@ class TelegramVacancyBot:
             return None
         try:
             api_url = f"https://api.hh.ru/vacancies/{vacancy_id}"
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            response = requests.get(api_url, headers=headers, timeout=10)
+            response = _HTTP_SESSION.get(api_url, timeout=10)
             if response.status_code != 200:
                 return None
-            data = response.json()
+            data = _json_loads(response.content)
             salary_data = data.get('salary')
             salary_str = 'Не указано'
             if salary_data:
@@ -412,25 +780,33 @@ class TelegramVacancyBot:
         return None
     
     def get_vacancy_description(self, vacancy_url: str) -> Optional[str]:
-        """Получение описания вакансии из HH API"""
+        """Получение описания вакансии из HH API (с кешем на 30 минут)"""
         try:
             # Извлекаем ID вакансии из URL
             if 'hh.ru/vacancy/' in vacancy_url:
                 vacancy_id = vacancy_url.split('/vacancy/')[-1].split('?')[0]
+
+                # Описание вакансии меняется редко: повторные нажатия кнопок
+                # по той же вакансии не ходят в API, пока запись не устарела
+                now = time.monotonic()
+                cached = self._description_cache.get(vacancy_id)
+                if cached is not None and now - cached[0] < self._description_cache_ttl:
+                    return cached[1]
+
                 api_url = f"https://api.hh.ru/vacancies/{vacancy_id}"
-                
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                
-                response = requests.get(api_url, headers=headers, timeout=10)
+
+                response = _HTTP_SESSION.get(api_url, timeout=10)
                 if response.status_code == 200:
-                    data = response.json()
+                    data = _json_loads(response.content)
                     description = data.get('description', '')
-                    # Очищаем HTML теги (простая очистка)
-                    import re
-                    description = re.sub(r'<[^>]+>', '', description)
-                    return description[:2000]  # Ограничиваем длину
+                    # Очищаем HTML теги и декодируем сущности (&nbsp;, &amp; и т.п.)
+                    description = html.unescape(_TAG_RE.sub('', description))
+                    description = description[:2000]  # Ограничиваем длину
+                    self._description_cache[vacancy_id] = (now, description)
+                    # Выбрасываем самые старые записи, чтобы кеш не рос бесконечно
+                    while len(self._description_cache) > 512:
+                        self._description_cache.pop(next(iter(self._description_cache)))
+                    return description
         except Exception as e:
             print(f"⚠️ Ошибка при получении описания вакансии: {e}")
         return None
@@ -455,6 +831,40 @@ class TelegramVacancyBot:
         # Всегда пытаемся использовать OpenAI сначала
         return self._generate_with_openai(vacancy_title, company, description, resume_text)
     
+    def _ensure_openai_client(self):
+        """Ленивая однократная инициализация клиента OpenAI.
+
+        Раньше импорт библиотеки и создание клиента происходили на каждое
+        письмо; клиент держит собственный HTTP-пул, поэтому создаём его
+        один раз и дальше переиспользуем.
+        """
+        if self._openai_init_done:
+            return
+        self._openai_init_done = True
+        try:
+            from openai import OpenAI
+            self._openai_client = OpenAI(api_key=self.openai_api_key)
+            print("✅ OpenAI клиент инициализирован")
+        except ImportError:
+            # Старая версия openai
+            try:
+                import openai
+                openai.api_key = self.openai_api_key
+                self._openai_legacy = True
+                print("✅ OpenAI (старая версия) инициализирован")
+            except Exception as e:
+                print(f"⚠️ Не удалось импортировать библиотеку openai: {e}")
+                self._openai_init_error = (
+                    'import_error',
+                    f"Библиотека openai не установлена или повреждена: {e}"
+                )
+        except Exception as e:
+            print(f"⚠️ Не удалось инициализировать OpenAI клиент: {e}")
+            self._openai_init_error = (
+                'initialization_error',
+                f"Ошибка инициализации OpenAI: {e}"
+            )
+
     def _generate_with_openai(self, vacancy_title: str, company: str, description: str, resume_text: str = None) -> tuple:
         """
         Генерация письма через OpenAI API
@@ -478,32 +888,17 @@ class TelegramVacancyBot:
             return self._generate_template(vacancy_title, company, description, resume_text), metadata
         
         try:
-            try:
-                from openai import OpenAI
-                client = OpenAI(api_key=self.openai_api_key)
-                metadata['openai_available'] = True
-                print("✅ OpenAI клиент инициализирован")
-            except ImportError:
-                # Старая версия openai
-                try:
-                    import openai
-                    openai.api_key = self.openai_api_key
-                    client = None
-                    metadata['openai_available'] = True
-                    print("✅ OpenAI (старая версия) инициализирован")
-                except Exception as e:
-                    print(f"⚠️ Не удалось импортировать библиотеку openai: {e}")
-                    metadata['error_message'] = f"Библиотека openai не установлена или повреждена: {e}"
-                    metadata['error_type'] = 'import_error'
-                    metadata['success'] = True
-                    return self._generate_template(vacancy_title, company, description, resume_text), metadata
-            except Exception as e:
-                print(f"⚠️ Не удалось инициализировать OpenAI клиент: {e}")
-                metadata['error_message'] = f"Ошибка инициализации OpenAI: {e}"
-                metadata['error_type'] = 'initialization_error'
+            # Клиент создаётся один раз на процесс и переиспользует HTTP-пул
+            self._ensure_openai_client()
+            if self._openai_init_error is not None:
+                error_type, error_message = self._openai_init_error
+                metadata['error_message'] = error_message
+                metadata['error_type'] = error_type
                 metadata['success'] = True
                 return self._generate_template(vacancy_title, company, description, resume_text), metadata
-            
+            metadata['openai_available'] = True
+            client = self._openai_client
+
             # Формируем промпт
             prompt_parts = [
                 f"Составь профессиональное сопроводительное письмо на русском языке для вакансии \"{vacancy_title}\" в компании \"{company}\".",
@@ -599,225 +994,270 @@ class TelegramVacancyBot:
         if not description:
             return requirements
         
-        desc_lower = description.lower()
-        
-        # Расширенный список ключевых слов и фраз
-        requirement_patterns = [
-            # Технологии и инструменты
-            {'keywords': ['agile', 'scrum', 'kanban', 'lean'], 'category': 'Методологии разработки'},
-            {'keywords': ['jira', 'confluence', 'notion', 'figma', 'miro'], 'category': 'Инструменты'},
-            {'keywords': ['sql', 'python', 'javascript', 'java', 'swift', 'kotlin'], 'category': 'Языки программирования'},
-            {'keywords': ['api', 'rest', 'graphql', 'microservices'], 'category': 'Архитектура'},
-            {'keywords': ['aws', 'azure', 'gcp', 'docker', 'kubernetes'], 'category': 'Инфраструктура'},
-            {'keywords': ['analytics', 'метрики', 'аналитика', 'bi', 'tableau'], 'category': 'Аналитика'},
-            {'keywords': ['ux', 'ui', 'дизайн', 'design'], 'category': 'Дизайн'},
-            {'keywords': ['a/b тест', 'ab тест', 'a/b testing'], 'category': 'Тестирование'},
-            {'keywords': ['b2b', 'b2c', 'saas', 'marketplace'], 'category': 'Бизнес-модели'},
-            
-            # Навыки и компетенции
-            {'keywords': ['roadmap', 'roadmap', 'дорожная карта'], 'category': 'Планирование'},
-            {'keywords': ['backlog', 'бэклог', 'приоритизация'], 'category': 'Управление задачами'},
-            {'keywords': ['stakeholder', 'стейкхолдер', 'коммуникация'], 'category': 'Коммуникации'},
-            {'keywords': ['метрики', 'kpi', 'okr', 'цели'], 'category': 'Метрики и цели'},
-            {'keywords': ['гипотеза', 'hypothesis', 'эксперимент'], 'category': 'Экспериментирование'},
-            {'keywords': ['юзер стори', 'user story', 'требования'], 'category': 'Работа с требованиями'},
-            {'keywords': ['анализ данных', 'data analysis', 'исследования'], 'category': 'Исследования'},
-            {'keywords': ['конкурентный анализ', 'competitive analysis'], 'category': 'Анализ рынка'},
-        ]
-        
-        for pattern in requirement_patterns:
-            for keyword in pattern['keywords']:
-                if keyword in desc_lower:
-                    # Находим контекст вокруг ключевого слова
-                    idx = desc_lower.find(keyword)
-                    context_start = max(0, idx - 100)
-                    context_end = min(len(description), idx + len(keyword) + 100)
-                    context = description[context_start:context_end].strip()
-                    
-                    requirement = {
-                        'keyword': keyword,
-                        'category': pattern['category'],
-                        'context': context
-                    }
-                    if requirement not in requirements:
-                        requirements.append(requirement)
-                    break
-        
+        desc_lower = _fold(description)
+        desc_len = len(description)
+        found_categories = set()
+
+        # Один проход объединённого регулярного выражения по описанию:
+        # не более одного требования на категорию (по первому вхождению)
+        for match in _REQ_SCAN_RE.finditer(desc_lower):
+            keyword = match.group(0)
+            for category in _REQ_KEYWORD_CATEGORIES[keyword]:
+                if category in found_categories:
+                    continue
+                found_categories.add(category)
+                # Находим контекст вокруг ключевого слова
+                idx = match.start()
+                context_start = max(0, idx - 100)
+                context_end = min(desc_len, match.end() + 100)
+                requirements.append({
+                    'keyword': keyword,
+                    'category': category,
+                    'context': description[context_start:context_end].strip()
+                })
+
         return requirements
     
+    def _lower_cached(self, text: str) -> str:
+        """Нормализация текста (нижний регистр, ё -> е) с кешем по тексту.
+
+        Резюме не меняется между генерациями писем, а свёртка длинного
+        кириллического текста каждый раз аллоцирует полную копию строки.
+        """
+        key = hash(text)
+        cached = self._lower_cache.get(key)
+        if cached is None:
+            cached = _fold(text)
+            self._lower_cache[key] = cached
+            if len(self._lower_cache) > 64:
+                self._lower_cache.pop(next(iter(self._lower_cache)))
+        return cached
+
+    def _resume_tokens(self, resume_lower: str) -> frozenset:
+        """Множество слов резюме (кешируется по тексту)"""
+        key = hash(resume_lower)
+        tokens = self._token_cache.get(key)
+        if tokens is None:
+            tokens = frozenset(_TOKEN_RE.findall(resume_lower))
+            self._token_cache[key] = tokens
+            if len(self._token_cache) > 64:
+                self._token_cache.pop(next(iter(self._token_cache)))
+        return tokens
+
     def _match_requirements_with_resume(self, requirements: List[Dict], resume_text: str) -> List[Dict]:
         """Сопоставление требований с резюме"""
-        if not resume_text:
+        if not resume_text or not requirements:
             return []
-        
-        resume_lower = resume_text.lower()
+
+        resume_lower = self._lower_cached(resume_text)
+        resume_len = len(resume_text)
         matched = []
-        
+
+        # Одно ключевое слово может принадлежать нескольким требованиям
+        by_keyword = {}
         for req in requirements:
-            keyword = req['keyword']
-            # Проверяем наличие ключевого слова в резюме
-            if keyword in resume_lower:
-                # Находим контекст в резюме
-                idx = resume_lower.find(keyword)
-                context_start = max(0, idx - 150)
-                context_end = min(len(resume_text), idx + len(keyword) + 150)
-                resume_context = resume_text[context_start:context_end].strip()
-                
+            by_keyword.setdefault(req['keyword'], []).append(req)
+
+        # Однословные ключевые слова проверяем по множеству слов резюме:
+        # O(1) вместо поиска подстроки, и 'java' не совпадает внутри
+        # 'javascript'; составные фразы остаются на сканировании подстрок
+        tokens = self._resume_tokens(resume_lower)
+        hits = []  # (ключевое слово, начало, конец)
+        substring_keywords = []
+        for keyword in by_keyword:
+            if _TOKEN_RE.fullmatch(keyword):
+                if keyword in tokens:
+                    idx = resume_lower.find(keyword)
+                    hits.append((keyword, idx, idx + len(keyword)))
+            else:
+                substring_keywords.append(keyword)
+
+        # Один проход по резюме тем же модульным регулярным выражением,
+        # что сканирует описания вакансий: требования — всегда подмножество
+        # таксономии, поэтому достаточно отфильтровать лишние совпадения
+        if substring_keywords:
+            remaining = set(substring_keywords)
+            for m in _REQ_SCAN_RE.finditer(resume_lower):
+                keyword = m.group(0)
+                if keyword in remaining:
+                    remaining.discard(keyword)
+                    hits.append((keyword, m.start(), m.end()))
+                    if not remaining:
+                        break
+
+        # Совпадения в порядке появления в резюме, как при линейном проходе
+        hits.sort(key=lambda hit: hit[1])
+        for keyword, start, end in hits:
+            # Находим контекст в резюме
+            context_start = max(0, start - 150)
+            context_end = min(resume_len, end + 150)
+            resume_context = resume_text[context_start:context_end].strip()
+            for req in by_keyword[keyword]:
                 matched.append({
                     'requirement': req,
                     'resume_context': resume_context,
                     'keyword': keyword
                 })
-        
+
         return matched
     
     def _generate_template(self, vacancy_title: str, company: str, description: str, resume_text: str = None) -> str:
         """Генерация письма по шаблону с детальным анализом требований"""
-        letter = f"""Здравствуйте!
+        # Письмо собираем в список и склеиваем один раз: каждый += на строке
+        # копировал бы весь накопленный префикс заново
+        parts = [f'''Здравствуйте!
 
 Меня заинтересовала вакансия "{vacancy_title}" в компании {company}. 
 
-"""
-        
+''']
+
         if resume_text and description:
             # Извлекаем требования из вакансии
             requirements = self._extract_requirements(description)
             print(f"📋 Найдено требований в вакансии: {len(requirements)}")
-            
+
             # Сопоставляем с резюме
             matched_requirements = self._match_requirements_with_resume(requirements, resume_text)
             print(f"✅ Найдено совпадений с резюме: {len(matched_requirements)}")
-            
+
             if matched_requirements:
-                # Собираем все ключевые слова из совпадений
-                keywords_list = []
+                # Один проход: дедупликация и форматирование сразу (ключевые
+                # слова уже в нижнем регистре после _extract_requirements)
+                unique_keywords = []
+                seen = set()
                 for match in matched_requirements:
                     keyword = match['keyword']
+                    if keyword in seen:
+                        continue
+                    seen.add(keyword)
                     # Форматируем ключевое слово
-                    if len(keyword) > 3:
-                        keyword_display = keyword.title()
-                    else:
-                        keyword_display = keyword.upper()
-                    keywords_list.append(keyword_display)
-                
-                # Убираем дубликаты, сохраняя порядок
-                unique_keywords = []
-                seen = set()
-                for kw in keywords_list:
-                    if kw.lower() not in seen:
-                        unique_keywords.append(kw)
-                        seen.add(kw.lower())
-                
+                    unique_keywords.append(keyword.title() if len(keyword) > 3 else keyword.upper())
+
                 # Формируем список через запятую
                 if unique_keywords:
                     keywords_str = ', '.join(unique_keywords)
-                    letter += f"Мой опыт соответствует требованиям: {keywords_str}. "
-                
-                letter += "Мой опыт, отраженный в резюме, показывает, что я обладаю необходимыми компетенциями для успешной работы на данной позиции. "
+                    parts.append(f"Мой опыт соответствует требованиям: {keywords_str}. ")
+
+                parts.append("Мой опыт, отраженный в резюме, показывает, что я обладаю необходимыми компетенциями для успешной работы на данной позиции. ")
             else:
                 # Если совпадений нет, используем общий подход
-                letter += "Изучив описание вакансии, я вижу, что мой опыт работы в продуктовой разработке и управления продуктами соответствует требованиям данной позиции. "
+                parts.append("Изучив описание вакансии, я вижу, что мой опыт работы в продуктовой разработке и управления продуктами соответствует требованиям данной позиции. ")
         elif description:
             # Если нет резюме, но есть описание
             requirements = self._extract_requirements(description)
             if requirements:
-                categories = list(set([r['category'] for r in requirements[:5]]))
-                letter += f"Я вижу, что в вакансии упоминаются следующие области: {', '.join(categories)}. "
-            letter += "Я имею опыт работы в продуктовой разработке и управления продуктами, что соответствует требованиям данной позиции. "
+                # dict.fromkeys: дедупликация с сохранением порядка категорий
+                categories = list(dict.fromkeys(r['category'] for r in requirements[:5]))
+                parts.append(f"Я вижу, что в вакансии упоминаются следующие области: {', '.join(categories)}. ")
+            parts.append("Я имею опыт работы в продуктовой разработке и управления продуктами, что соответствует требованиям данной позиции. ")
         else:
-            letter += "Я имею опыт работы в продуктовой разработке и управления продуктами, что соответствует требованиям данной позиции. "
-        
-        letter += """Буду рад обсудить, как мой опыт может быть полезен для вашей команды. Готов предоставить дополнительную информацию и ответить на ваши вопросы.
+            parts.append("Я имею опыт работы в продуктовой разработке и управления продуктами, что соответствует требованиям данной позиции. ")
+
+        parts.append("""Буду рад обсудить, как мой опыт может быть полезен для вашей команды. Готов предоставить дополнительную информацию и ответить на ваши вопросы.
 
 С уважением,
-[Ваше имя]"""
-        
-        return letter
-    
+[Ваше имя]""")
+
+        return ''.join(parts)
+
     def format_vacancy_message(self, vacancy: Dict) -> str:
         """Форматирование сообщения о вакансии"""
-        # Форматируем дату публикации
+        # Разбор даты кеширован (_parse_published_date), а относительная
+        # строка («2 ч. назад») считается на каждую отправку: замороженная
+        # строка устаревала бы в поздних пачках и после рестарта
         published_date = self._format_published_date(vacancy.get('published', ''))
         
-        message = f"""🎯 <b>{vacancy['title']}</b>
+        parts = [f"""🎯 <b>{vacancy['title']}</b>
 
 🏢 Компания: {vacancy['company']}
 📍 Локация: {vacancy['location']}
 💰 Зарплата: {vacancy['salary']}
-📅 Источник: {vacancy['source']}"""
-        
+📅 Источник: {vacancy['source']}"""]
+
         if published_date:
-            message += f"\n📆 Опубликовано: {published_date}"
-        
-        message += f"\n🔗 Ссылка: {vacancy['url']}"
-        
-        return message
+            parts.append(f"\n📆 Опубликовано: {published_date}")
+
+        parts.append(f"\n🔗 Ссылка: {vacancy['url']}")
+
+        return ''.join(parts)
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _parse_published_date(published_str: str) -> Optional[datetime]:
+        """Разбор даты публикации с кешем по исходной строке.
+
+        Кешируется только datetime — он стабилен для строки; относительное
+        представление зависит от текущего момента и кешированию не подлежит.
+        """
+        # Один матч регулярного выражения вместо цепочки split/replace
+        # и разбора через исключения; часовой пояс, как и раньше, игнорируется
+        m = _ISO_DATE_RE.match(published_str)
+        if not m:
+            return None
+        year, month, day, hour, minute, second = m.groups()
+        try:
+            return datetime(int(year), int(month), int(day),
+                            int(hour or 0), int(minute or 0), int(second or 0))
+        except ValueError:
+            return None
+
     def _format_published_date(self, published_str: str) -> str:
         """Форматирование даты публикации в читаемый вид"""
         if not published_str:
             return ""
-        
-        try:
-            # Парсим ISO формат даты (например: "2026-01-27T12:15:18+0300")
-            # Убираем временную зону для упрощения
-            date_str = published_str.split('+')[0].split('-')[0] if '+' in published_str else published_str.split('T')[0]
-            
-            # Пробуем разные форматы
-            try:
-                # Формат ISO: "2026-01-27T12:15:18+0300" или "2026-01-27T12:15:18"
-                if 'T' in published_str:
-                    dt = datetime.fromisoformat(published_str.replace('+', '+').split('+')[0])
-                else:
-                    dt = datetime.fromisoformat(published_str)
-                
-                # Вычисляем разницу с текущим временем
-                now = datetime.now(dt.tzinfo) if dt.tzinfo else datetime.now()
-                if dt.tzinfo:
-                    now = datetime.now(dt.tzinfo)
-                else:
-                    now = datetime.now()
-                
-                delta = now - dt.replace(tzinfo=None) if dt.tzinfo else now - dt
-                
-                # Форматируем в зависимости от давности
-                if delta.days == 0:
-                    hours = delta.seconds // 3600
-                    if hours == 0:
-                        minutes = delta.seconds // 60
-                        if minutes == 0:
-                            return "только что"
-                        return f"{minutes} мин. назад"
-                    return f"{hours} ч. назад"
-                elif delta.days == 1:
-                    return "вчера"
-                elif delta.days < 7:
-                    return f"{delta.days} дн. назад"
-                elif delta.days < 30:
-                    weeks = delta.days // 7
-                    return f"{weeks} нед. назад"
-                else:
-                    # Форматируем как дату
-                    months = ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
-                             'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря']
-                    return f"{dt.day} {months[dt.month - 1]} {dt.year}"
-            except:
-                # Если не удалось распарсить, возвращаем как есть
-                return published_str.split('T')[0] if 'T' in published_str else published_str
-        except Exception as e:
-            # В случае ошибки возвращаем пустую строку
-            return ""
-    
+
+        dt = self._parse_published_date(published_str)
+        if dt is None:
+            # Если не удалось распарсить, возвращаем как есть
+            return published_str.split('T')[0] if 'T' in published_str else published_str
+
+        delta = datetime.now() - dt
+
+        # Форматируем в зависимости от давности
+        if delta.days == 0:
+            hours = delta.seconds // 3600
+            if hours == 0:
+                minutes = delta.seconds // 60
+                if minutes == 0:
+                    return "только что"
+                return f"{minutes} мин. назад"
+            return f"{hours} ч. назад"
+        elif delta.days == 1:
+            return "вчера"
+        elif delta.days < 7:
+            return f"{delta.days} дн. назад"
+        elif delta.days < 30:
+            weeks = delta.days // 7
+            return f"{weeks} нед. назад"
+        else:
+            # Форматируем как дату
+            return f"{dt.day} {_MONTHS_RU[dt.month - 1]} {dt.year}"
+
     def _get_vacancy_id(self, vacancy_url: str) -> str:
         """Извлечение ID вакансии из URL для callback_data"""
-        try:
-            if 'hh.ru/vacancy/' in vacancy_url:
-                return vacancy_url.split('/vacancy/')[-1].split('?')[0]
-            # Для других источников используем хеш
-            import hashlib
-            return hashlib.md5(vacancy_url.encode()).hexdigest()[:16]
-        except:
+        # Явная проверка вместо try/except: для непустой строки regex и md5
+        # не бросают исключений, и объект исключения не создаётся вовсе
+        if not isinstance(vacancy_url, str) or not vacancy_url:
             return str(hash(vacancy_url))[:16]
+        return _vacancy_id_from_url(vacancy_url)
+
+    def _find_vacancy_by_id(self, vacancy_id: str) -> Optional[Dict]:
+        """Поиск вакансии из файла по callback-ID через обратный индекс.
+
+        Индекс перестраивается только при изменении файла вакансий —
+        раньше каждое нажатие кнопки заново хешировало все URL списка.
+        """
+        try:
+            mtime = os.path.getmtime(self.vacancies_file)
+        except OSError:
+            mtime = None
+        if mtime != self._vacancy_index_mtime:
+            get_id = self._get_vacancy_id
+            self._vacancy_index = {
+                get_id(v.get('url', '')): v for v in self.load_vacancies()
+            }
+            self._vacancy_index_mtime = mtime
+        return self._vacancy_index.get(vacancy_id)
     
     async def send_vacancy(self, vacancy: Dict, context: ContextTypes.DEFAULT_TYPE, chat_id: int = None):
         """Отправка вакансии в канал с кнопками"""
@@ -836,19 +1276,12 @@ class TelegramVacancyBot:
         # Используем ID вместо полного URL для callback_data (ограничение Telegram - 64 байта)
         vacancy_id = self._get_vacancy_id(vacancy_url)
         
-        # Сохраняем соответствие ID -> URL в контексте
-        if not hasattr(context.bot_data, 'vacancy_urls'):
-            context.bot_data['vacancy_urls'] = {}
-        context.bot_data['vacancy_urls'][vacancy_id] = vacancy
+        # Сохраняем соответствие ID -> URL в контексте (bot_data — словарь,
+        # hasattr на нём всегда False; setdefault делает то же одной операцией)
+        context.bot_data.setdefault('vacancy_urls', {})[vacancy_id] = vacancy
         
-        # Создаем кнопки
-        keyboard = [
-            [
-                InlineKeyboardButton("✅ Да, составить", callback_data=f"yes_{vacancy_id}"),
-                InlineKeyboardButton("❌ Нет", callback_data=f"no_{vacancy_id}")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # Кнопки из кешированной фабрики: одна сборка markup на вакансию
+        reply_markup = _yesno_markup(vacancy_id)
         
         # Добавляем вопрос
         full_message = f"{message}\n\n❓ <b>Необходимо ли составить сопроводительное письмо?</b>"
@@ -871,7 +1304,7 @@ class TelegramVacancyBot:
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработка нажатий на кнопки"""
         try:
-            print("🔔 handle_callback вызван")
+            logger.debug("🔔 handle_callback вызван")
             query = update.callback_query
             
             if not query:
@@ -879,25 +1312,24 @@ class TelegramVacancyBot:
                 return
             
             data = query.data
-            print(f"🔔 Получен callback data: {data}")
-            print(f"🔔 Query object: {query}")
-            print(f"🔔 Message chat_id: {query.message.chat_id if query.message else 'None'}")
+            logger.debug("🔔 Получен callback data: %s", data)
+            logger.debug("🔔 Query object: %s", query)
+            logger.debug("🔔 Message chat_id: %s", query.message.chat_id if query.message else None)
             
             # Отвечаем на callback сразу, чтобы Telegram знал, что запрос обработан
             try:
                 await query.answer()
-                print("✅ Callback answer отправлен")
+                logger.debug("✅ Callback answer отправлен")
             except Exception as e:
                 print(f"⚠️ Ошибка при отправке callback answer: {e}")
             
             if data.startswith('yes_'):
                 vacancy_id = data.replace('yes_', '')
-                print(f"✅ Обрабатываю 'Да' для vacancy_id: {vacancy_id}")
+                logger.debug("✅ Обрабатываю 'Да' для vacancy_id: %s", vacancy_id)
                 try:
                     await self.handle_yes(query, vacancy_id, context)
                 except Exception as e:
                     print(f"❌ Ошибка в handle_yes: {e}")
-                    import traceback
                     traceback.print_exc()
                     try:
                         await query.answer(f"Ошибка: {e}", show_alert=True)
@@ -905,45 +1337,43 @@ class TelegramVacancyBot:
                         pass
             elif data.startswith('no_'):
                 vacancy_id = data.replace('no_', '')
-                print(f"✅ Обрабатываю 'Нет' для vacancy_id: {vacancy_id}")
+                logger.debug("✅ Обрабатываю 'Нет' для vacancy_id: %s", vacancy_id)
                 await self.handle_no(query, vacancy_id)
             elif data == 'send_more':
-                print("✅ Обрабатываю 'Отправить ещё вакансии'")
+                logger.debug("✅ Обрабатываю 'Отправить ещё вакансии'")
                 await self.handle_send_more(query, context)
             elif data == 'start':
-                print("✅ Обрабатываю 'Начать'")
+                logger.debug("✅ Обрабатываю 'Начать'")
                 await self.handle_start_button(query, context)
             elif data.startswith('apply_'):
                 vacancy_id = data.replace('apply_', '')
-                print(f"✅ Обрабатываю 'Откликнуться на вакансию' для vacancy_id: {vacancy_id}")
+                logger.debug("✅ Обрабатываю 'Откликнуться на вакансию' для vacancy_id: %s", vacancy_id)
                 await self.handle_apply_vacancy(query, vacancy_id, context)
             elif data.startswith('confirm_position_'):
                 try:
                     user_id_str = data.replace('confirm_position_', '')
                     user_id = int(user_id_str)
-                    print(f"✅ Обрабатываю подтверждение должности для user_id: {user_id}")
-                    print(f"🔍 Callback data: {data}, извлеченный user_id: {user_id}")
+                    logger.debug("✅ Обрабатываю подтверждение должности для user_id: %s", user_id)
+                    logger.debug("🔍 Callback data: %s, извлеченный user_id: %s", data, user_id)
                     await self.handle_confirm_position(query, user_id, context)
                 except ValueError as e:
                     print(f"❌ Ошибка при парсинге user_id из '{data}': {e}")
                     await query.answer("Ошибка: неверный формат данных", show_alert=True)
                 except Exception as e:
                     print(f"❌ Ошибка при обработке подтверждения должности: {e}")
-                    import traceback
                     traceback.print_exc()
                     await query.answer(f"Ошибка: {e}", show_alert=True)
             elif data.startswith('change_position_'):
                 try:
                     user_id_str = data.replace('change_position_', '')
                     user_id = int(user_id_str)
-                    print(f"✅ Обрабатываю изменение должности для user_id: {user_id}")
+                    logger.debug("✅ Обрабатываю изменение должности для user_id: %s", user_id)
                     await self.handle_change_position(query, user_id, context)
                 except ValueError as e:
                     print(f"❌ Ошибка при парсинге user_id из '{data}': {e}")
                     await query.answer("Ошибка: неверный формат данных", show_alert=True)
                 except Exception as e:
                     print(f"❌ Ошибка при обработке изменения должности: {e}")
-                    import traceback
                     traceback.print_exc()
                     await query.answer(f"Ошибка: {e}", show_alert=True)
             else:
@@ -951,7 +1381,6 @@ class TelegramVacancyBot:
                 await query.answer("Неизвестная команда", show_alert=True)
         except Exception as e:
             print(f"❌ Ошибка в handle_callback: {e}")
-            import traceback
             traceback.print_exc()
             try:
                 if query:
@@ -962,41 +1391,36 @@ class TelegramVacancyBot:
     async def handle_yes(self, query, vacancy_id: str, context: ContextTypes.DEFAULT_TYPE):
         """Обработка нажатия "Да" - генерация письма"""
         try:
-            print(f"📝 Начало генерации письма для vacancy_id: {vacancy_id}")
+            logger.debug("📝 Начало генерации письма для vacancy_id: %s", vacancy_id)
             await query.edit_message_text("⏳ Составляю сопроводительное письмо...")
             
             # Получаем вакансию из сохраненных данных или загружаем из файла
             vacancy = None
             
             # Проверяем кеш в bot_data
-            if not hasattr(context.bot_data, 'vacancy_urls'):
-                context.bot_data['vacancy_urls'] = {}
+            context.bot_data.setdefault('vacancy_urls', {})
             
-            print(f"🔍 Проверяю кеш, vacancy_id: {vacancy_id}")
-            print(f"🔍 Доступные ID в кеше: {list(context.bot_data.get('vacancy_urls', {}).keys())}")
+            logger.debug("🔍 Проверяю кеш, vacancy_id: %s", vacancy_id)
+            if logger.isEnabledFor(logging.DEBUG):
+                # Список ключей строим только когда DEBUG реально включён
+                logger.debug("🔍 Доступные ID в кеше: %s", list(context.bot_data['vacancy_urls'].keys()))
             if vacancy_id in context.bot_data.get('vacancy_urls', {}):
                 vacancy = context.bot_data['vacancy_urls'][vacancy_id]
-                print(f"✅ Вакансия найдена в кеше: {vacancy.get('title', 'Без названия')}")
+                logger.debug("✅ Вакансия найдена в кеше: %s", vacancy.get('title', 'Без названия'))
             
-            # Если не найдено в кеше, ищем в файле
+            # Если не найдено в кеше, ищем в файле по обратному индексу
             if not vacancy:
-                print(f"🔍 Ищу вакансию в файле по vacancy_id: {vacancy_id}")
-                vacancies = self.load_vacancies()
-                print(f"📄 Загружено вакансий из файла: {len(vacancies)}")
-                for v in vacancies:
-                    v_id = self._get_vacancy_id(v['url'])
-                    print(f"  Проверяю: {v_id} == {vacancy_id}")
-                    if v_id == vacancy_id:
-                        vacancy = v
-                        print(f"✅ Вакансия найдена в файле: {vacancy['title']}")
-                        break
+                logger.debug("🔍 Ищу вакансию в файле по vacancy_id: %s", vacancy_id)
+                vacancy = self._find_vacancy_by_id(vacancy_id)
+                if vacancy:
+                    logger.debug("✅ Вакансия найдена в файле: %s", vacancy['title'])
             
             # Если всё ещё не найдено (например, после перезапуска бота на Railway) — загружаем из HH API по ID
             if not vacancy and str(vacancy_id).strip().isdigit():
-                print(f"🔍 Загружаю вакансию {vacancy_id} из HH API...")
+                logger.debug("🔍 Загружаю вакансию %s из HH API...", vacancy_id)
                 vacancy = self.get_vacancy_by_id_from_api(vacancy_id)
                 if vacancy:
-                    print(f"✅ Вакансия загружена из API: {vacancy.get('title', '')}")
+                    logger.debug("✅ Вакансия загружена из API: %s", vacancy.get('title', ''))
             
             if not vacancy:
                 print(f"❌ Вакансия не найдена для vacancy_id: {vacancy_id}")
@@ -1004,7 +1428,7 @@ class TelegramVacancyBot:
                 return
             
             # Получаем описание вакансии
-            print("📄 Получаю описание вакансии...")
+            logger.debug("📄 Получаю описание вакансии...")
             vacancy_url = vacancy.get('url', '')  # Сохраняем URL вакансии
             if not vacancy_url:
                 print("❌ URL вакансии не найден")
@@ -1012,34 +1436,38 @@ class TelegramVacancyBot:
                 return
             
             try:
-                description = self.get_vacancy_description(vacancy_url)
-                print(f"✅ Описание получено: {len(description or '')} символов")
+                # Блокирующий HTTP-запрос уводим в поток: event loop продолжает
+                # обслуживать остальные чаты, пока HH отвечает
+                description = await asyncio.to_thread(self.get_vacancy_description, vacancy_url)
+                logger.debug("✅ Описание получено: %s символов", len(description or ''))
             except Exception as e:
                 print(f"⚠️ Ошибка при получении описания: {e}")
                 description = ''  # Продолжаем без описания
             
             # Получаем user_id для поиска резюме
             user_id = query.from_user.id if query.from_user else None
-            print(f"👤 User ID: {user_id}")
+            logger.debug("👤 User ID: %s", user_id)
             if user_id and user_id in self.resumes:
-                print(f"📄 Найдено резюме для user_id: {user_id}")
+                logger.debug("📄 Найдено резюме для user_id: %s", user_id)
             else:
-                print(f"ℹ️ Резюме не найдено для user_id: {user_id}")
+                logger.debug("ℹ️ Резюме не найдено для user_id: %s", user_id)
             
-            # Генерируем письмо (с учетом резюме, если есть)
-            print("🤖 Генерирую сопроводительное письмо...")
+            # Генерируем письмо (с учетом резюме, если есть).
+            # Внутри — блокирующий HTTP-вызов OpenAI на секунды, поэтому
+            # выносим в поток, не останавливая обработку других чатов
+            logger.debug("🤖 Генерирую сопроводительное письмо...")
             try:
-                cover_letter, generation_metadata = self.generate_cover_letter(
+                cover_letter, generation_metadata = await asyncio.to_thread(
+                    self.generate_cover_letter,
                     vacancy.get('title', 'Вакансия'),
                     vacancy.get('company', 'Компания'),
                     description or '',
                     user_id
                 )
-                print(f"✅ Письмо сгенерировано: {len(cover_letter)} символов")
-                print(f"📊 Метод генерации: {generation_metadata.get('method', 'unknown')}")
+                logger.debug("✅ Письмо сгенерировано: %s символов", len(cover_letter))
+                logger.debug("📊 Метод генерации: %s", generation_metadata.get('method', 'unknown'))
             except Exception as e:
                 print(f"❌ Ошибка при генерации письма: {e}")
-                import traceback
                 traceback.print_exc()
                 await query.edit_message_text(f"❌ Ошибка при генерации письма: {e}")
                 return
@@ -1055,18 +1483,7 @@ class TelegramVacancyBot:
                 # Определяем причину
                 error_type = generation_metadata.get('error_type')
                 if error_type:
-                    error_descriptions = {
-                        'no_api_key': 'API ключ OpenAI не установлен',
-                        'import_error': 'Библиотека openai не установлена',
-                        'initialization_error': 'Ошибка инициализации OpenAI клиента',
-                        'region_forbidden': 'OpenAI недоступен в вашем регионе',
-                        'unauthorized': 'Неверный API ключ OpenAI',
-                        'rate_limit': 'Превышен лимит запросов к OpenAI',
-                        'timeout': 'Таймаут при подключении к OpenAI',
-                        'connection_error': 'Проблема с подключением к OpenAI',
-                        'unknown_error': 'Ошибка при подключении к OpenAI'
-                    }
-                    error_desc = error_descriptions.get(error_type, 'Неизвестная ошибка')
+                    error_desc = _ERROR_DESCRIPTIONS.get(error_type, 'Неизвестная ошибка')
                     method_info += f"\n⚠️ <i>Не удалось использовать OpenAI: {error_desc}</i>"
                 else:
                     method_info += "\n⚠️ <i>Не удалось использовать OpenAI (причина не указана)</i>"
@@ -1090,14 +1507,14 @@ class TelegramVacancyBot:
             reply_markup = None
             if 'hh.ru' in vacancy_url:
                 vacancy_id = self._get_vacancy_id(vacancy_url)
-                keyboard = [
-                    [InlineKeyboardButton("📤 Откликнуться на вакансию", callback_data=f"apply_{vacancy_id}")]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+                reply_markup = _apply_markup(vacancy_id)
+                # Запоминаем письмо: при нажатии «Откликнуться» не придётся
+                # заново качать описание и генерировать текст
+                context.bot_data.setdefault('cover_letters', {})[vacancy_id] = cover_letter
             
-            print("📤 Отправляю письмо...")
-            print(f"📤 Chat ID: {query.message.chat_id}")
-            print(f"📤 Длина письма: {len(letter_message)} символов")
+            logger.debug("📤 Отправляю письмо...")
+            logger.debug("📤 Chat ID: %s", query.message.chat_id)
+            logger.debug("📤 Длина письма: %s символов", len(letter_message))
             
             try:
                 await context.bot.send_message(
@@ -1106,25 +1523,23 @@ class TelegramVacancyBot:
                     parse_mode='HTML',
                     reply_markup=reply_markup
                 )
-                print("✅ Письмо отправлено через send_message")
+                logger.debug("✅ Письмо отправлено через send_message")
             except Exception as e:
                 print(f"❌ Ошибка при отправке письма: {e}")
-                import traceback
                 traceback.print_exc()
                 raise
             
             try:
                 await query.edit_message_text("✅ Сопроводительное письмо отправлено!")
-                print("✅ Сообщение обновлено на 'Письмо отправлено'")
+                logger.debug("✅ Сообщение обновлено на 'Письмо отправлено'")
             except Exception as e:
                 print(f"⚠️ Ошибка при обновлении сообщения после отправки: {e}")
                 # Не критично, письмо уже отправлено
             
-            print("✅ Письмо успешно отправлено!")
+            logger.debug("✅ Письмо успешно отправлено!")
         except Exception as e:
             error_msg = f"❌ Ошибка: {e}"
             print(f"❌ Ошибка в handle_yes: {e}")
-            import traceback
             traceback.print_exc()
             try:
                 await query.edit_message_text(error_msg)
@@ -1142,11 +1557,8 @@ class TelegramVacancyBot:
         """Отправка сообщения с кнопкой 'Отправить ещё вакансии' в указанный чат (или self.chat_id)."""
         target_chat_id = chat_id if chat_id is not None else self.chat_id
         try:
-            keyboard = [
-                [InlineKeyboardButton("📤 Отправить ещё вакансии", callback_data="send_more")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
+            reply_markup = _SEND_MORE_MARKUP
+
             message = f"✅ Отправлено 10 вакансий!\n\n📊 Осталось вакансий: {remaining_count}\n\nНажмите кнопку, чтобы отправить ещё 10 вакансий."
             
             await context.bot.send_message(
@@ -1186,14 +1598,7 @@ class TelegramVacancyBot:
             vacancies = batch['vacancies']
             offset = batch['offset']
             to_send = vacancies[offset:offset + 10]
-            sent = 0
-            for v in to_send:
-                try:
-                    if await self.send_vacancy(v, context, chat_id=user_id):
-                        sent += 1
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    print(f"⚠️ Ошибка при отправке вакансии: {e}")
+            sent = await self._send_batch(to_send, context, user_id)
             batch['offset'] = offset + len(to_send)
             remaining = len(vacancies) - batch['offset']
             if remaining > 0:
@@ -1208,7 +1613,6 @@ class TelegramVacancyBot:
             await query.answer()
         except Exception as e:
             print(f"❌ Ошибка при обработке 'Отправить ещё': {e}")
-            import traceback
             traceback.print_exc()
             try:
                 await query.answer(f"Ошибка: {e}", show_alert=True)
@@ -1231,7 +1635,6 @@ class TelegramVacancyBot:
                 
         except Exception as e:
             print(f"❌ Ошибка при обработке 'Начать': {e}")
-            import traceback
             traceback.print_exc()
             try:
                 await query.answer(f"Ошибка: {e}", show_alert=True)
@@ -1245,14 +1648,10 @@ class TelegramVacancyBot:
             
             # Получаем данные вакансии (кеш → файл → HH API)
             vacancy = None
-            if hasattr(context.bot_data, 'vacancy_urls') and vacancy_id in context.bot_data.get('vacancy_urls', {}):
+            if vacancy_id in context.bot_data.get('vacancy_urls', {}):
                 vacancy = context.bot_data['vacancy_urls'][vacancy_id]
             if not vacancy:
-                vacancies = self.load_vacancies()
-                for v in vacancies:
-                    if self._get_vacancy_id(v.get('url', '')) == vacancy_id:
-                        vacancy = v
-                        break
+                vacancy = self._find_vacancy_by_id(vacancy_id)
             if not vacancy and str(vacancy_id).strip().isdigit():
                 vacancy = self.get_vacancy_by_id_from_api(vacancy_id)
             
@@ -1278,8 +1677,12 @@ class TelegramVacancyBot:
                 )
                 return
             
-            # Отправляем отклик через HH API
-            success = await self._apply_to_hh_vacancy(vacancy_id, vacancy_url, query.message.chat_id, vacancy)
+            # Отправляем отклик через HH API (письмо из handle_yes переиспользуем)
+            cached_letter = context.bot_data.get('cover_letters', {}).get(vacancy_id)
+            success = await self._apply_to_hh_vacancy(
+                vacancy_id, vacancy_url, query.message.chat_id, vacancy,
+                cover_letter=cached_letter
+            )
             
             if success:
                 await query.answer("✅ Отклик успешно отправлен!", show_alert=True)
@@ -1295,29 +1698,35 @@ class TelegramVacancyBot:
                 
         except Exception as e:
             print(f"❌ Ошибка при обработке отклика: {e}")
-            import traceback
             traceback.print_exc()
             try:
                 await query.answer(f"Ошибка: {e}", show_alert=True)
             except:
                 pass
     
-    async def _apply_to_hh_vacancy(self, vacancy_id: str, vacancy_url: str, user_chat_id: int, vacancy: Dict) -> bool:
+    async def _apply_to_hh_vacancy(self, vacancy_id: str, vacancy_url: str, user_chat_id: int, vacancy: Dict,
+                                   cover_letter: Optional[str] = None) -> bool:
         """Отправка отклика на вакансию через HH API"""
         try:
             # Получаем резюме пользователя для сопроводительного письма
             user_id = user_chat_id
             cover_letter_text = ""
-            
-            if user_id in self.resumes:
+
+            if cover_letter:
+                # Письмо уже сгенерировано в handle_yes — не тратим повторный
+                # HTTP-запрос за описанием и вызов генерации
+                cover_letter_text = cover_letter
+            elif user_id in self.resumes:
                 # Генерируем сопроводительное письмо на основе резюме
                 vacancy_title = vacancy.get('title', 'Вакансия')
                 company = vacancy.get('company', 'Компания')
                 
-                # Получаем описание вакансии
-                description = self.get_vacancy_description(vacancy_url)
+                # Получаем описание вакансии (в потоке, не блокируя event loop)
+                description = await asyncio.to_thread(self.get_vacancy_description, vacancy_url)
                 if description:
-                    cover_letter, _ = self.generate_cover_letter(
+                    # Генерация ходит в OpenAI блокирующим HTTP — тоже в поток
+                    cover_letter, _ = await asyncio.to_thread(
+                        self.generate_cover_letter,
                         vacancy_title, company, description, user_id
                     )
                     cover_letter_text = cover_letter
@@ -1339,60 +1748,73 @@ class TelegramVacancyBot:
                     "С уважением"
                 )
             
-            # Получаем список резюме пользователя из HH
-            resumes_response = requests.get(
-                'https://api.hh.ru/resumes',
-                headers={
-                    'Authorization': f'Bearer {self.hh_access_token}',
-                    'User-Agent': 'Mozilla/5.0'
-                },
-                timeout=10
+            # Оба HTTP-запроса (резюме + отклик) блокирующие — выполняем
+            # их в потоке, чтобы event loop не ждал ответов HH API
+            return await asyncio.to_thread(
+                self._post_hh_negotiation, vacancy_id, cover_letter_text
             )
-            
-            if resumes_response.status_code != 200:
-                print(f"❌ Ошибка при получении резюме: {resumes_response.status_code} - {resumes_response.text}")
-                return False
-            
-            resumes_data = resumes_response.json()
-            if not resumes_data.get('items'):
-                print("❌ У пользователя нет резюме на HH")
-                return False
-            
-            # Берем первое активное резюме
-            resume_id = resumes_data['items'][0]['id']
-            
-            # Отправляем отклик
-            apply_url = f'https://api.hh.ru/negotiations'
-            apply_data = {
-                'vacancy_id': vacancy_id,
-                'resume_id': resume_id,
-                'message': cover_letter_text
-            }
-            
-            apply_response = requests.post(
-                apply_url,
-                headers={
-                    'Authorization': f'Bearer {self.hh_access_token}',
-                    'User-Agent': 'Mozilla/5.0',
-                    'Content-Type': 'application/json'
-                },
-                json=apply_data,
-                timeout=10
-            )
-            
-            if apply_response.status_code in [201, 200]:
-                print(f"✅ Отклик успешно отправлен на вакансию {vacancy_id}")
-                return True
-            else:
-                error_text = apply_response.text
-                print(f"❌ Ошибка при отправке отклика: {apply_response.status_code} - {error_text}")
-                return False
-                
+
         except Exception as e:
             print(f"❌ Ошибка при отправке отклика: {e}")
-            import traceback
             traceback.print_exc()
             return False
+
+    def _get_hh_resume_id(self) -> Optional[str]:
+        """ID активного резюме на HH (кешируется: без лишнего GET на каждый отклик)"""
+        now = time.monotonic()
+        if self._hh_resume_id and now - self._hh_resume_id_ts < self._hh_resume_id_ttl:
+            return self._hh_resume_id
+
+        resumes_response = _HTTP_SESSION.get(
+            'https://api.hh.ru/resumes',
+            headers={'Authorization': f'Bearer {self.hh_access_token}'},
+            timeout=10
+        )
+        if resumes_response.status_code != 200:
+            print(f"❌ Ошибка при получении резюме: {resumes_response.status_code} - {resumes_response.text}")
+            return None
+
+        resumes_data = _json_loads(resumes_response.content)
+        if not resumes_data.get('items'):
+            print("❌ У пользователя нет резюме на HH")
+            return None
+
+        # Берем первое активное резюме
+        self._hh_resume_id = resumes_data['items'][0]['id']
+        self._hh_resume_id_ts = now
+        return self._hh_resume_id
+
+    def _post_hh_negotiation(self, vacancy_id: str, cover_letter_text: str) -> bool:
+        """Блокирующая часть отклика: получение резюме и POST в HH API"""
+        resume_id = self._get_hh_resume_id()
+        if not resume_id:
+            return False
+
+        # Отправляем отклик
+        apply_url = 'https://api.hh.ru/negotiations'
+        apply_data = {
+            'vacancy_id': vacancy_id,
+            'resume_id': resume_id,
+            'message': cover_letter_text
+        }
+
+        apply_response = _HTTP_SESSION.post(
+            apply_url,
+            headers={'Authorization': f'Bearer {self.hh_access_token}'},
+            json=apply_data,
+            timeout=10
+        )
+
+        if apply_response.status_code in [201, 200]:
+            print(f"✅ Отклик успешно отправлен на вакансию {vacancy_id}")
+            return True
+        if apply_response.status_code in (401, 403):
+            # Токен/резюме могли устареть — сбрасываем кеш, следующий отклик
+            # заново спросит /resumes
+            self._hh_resume_id = None
+        error_text = apply_response.text
+        print(f"❌ Ошибка при отправке отклика: {apply_response.status_code} - {error_text}")
+        return False
     
     async def handle_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработка загрузки документа (резюме)"""
@@ -1417,33 +1839,39 @@ class TelegramVacancyBot:
             # AC1.1: Отвечаем сразу
             await update.message.reply_text("Спасибо! Обрабатываю ваше резюме...")
             
-            # Скачиваем файл
+            # Скачиваем файл сразу в память: разбор не ждёт записи на диск
+            # и не перечитывает только что записанный файл
             file = await context.bot.get_file(document.file_id)
             file_path = os.path.join(self.resumes_dir, f"resume_{user_id}_{document.file_name}")
-            await file.download_to_drive(file_path)
-            
-            # Извлекаем текст из файла
-            resume_text = self._extract_text_from_file(file_path)
-            
+            buf = bytes(await file.download_as_bytearray())
+            file_ext = os.path.splitext(file_name)[1]
+
+            # Оригинал сохраняем в фоне — ответ пользователю не ждёт диска.
+            # Ссылку на задачу держим до завершения: безымянный create_task
+            # может быть собран сборщиком мусора посреди записи
+            task = asyncio.create_task(asyncio.to_thread(self._write_file_bytes, file_path, buf))
+            self._bg_tasks.add(task)
+            task.add_done_callback(self._bg_tasks.discard)
+
+            # Извлекаем текст в потоке: разбор многостраничного PDF
+            # может занимать секунды, event loop в это время свободен
+            resume_text = await asyncio.to_thread(self._extract_text_from_bytes, buf, file_ext)
+
             if resume_text and not resume_text.startswith("⚠️"):
                 # Сохраняем резюме
                 self.resumes[user_id] = resume_text
+
+                # Сохраняем в файл для постоянного хранения (запись — тоже в потоке)
+                resume_text_file = os.path.join(self.resumes_dir, f"resume_{user_id}.txt.gz")
+                await asyncio.to_thread(self._write_resume_text, resume_text_file, resume_text)
                 
-                # Сохраняем в файл для постоянного хранения
-                resume_text_file = os.path.join(self.resumes_dir, f"resume_{user_id}.txt")
-                with open(resume_text_file, 'w', encoding='utf-8') as f:
-                    f.write(resume_text)
-                
-                # Извлекаем должность из резюме
-                position = self._extract_position_from_resume(resume_text)
-                
-                # Извлекаем зарплату из резюме (опционально)
-                salary = self._extract_salary_from_resume(resume_text)
+                # Извлекаем должность и зарплату из резюме (один разбор, с кешем)
+                position, salary = self._parse_resume(resume_text)
                 
                 if position:
                     # Сохраняем извлеченную должность
                     self.user_positions[user_id] = position
-                    self._save_users_data()
+                    self._mark_dirty('users')
                     
                     # Формируем сообщение с должностью и зарплатой (если найдена)
                     position_message = f"Я определил вашу желаемую должность как **{position}**"
@@ -1485,7 +1913,6 @@ class TelegramVacancyBot:
                 )
         except Exception as e:
             print(f"❌ Ошибка при обработке резюме: {e}")
-            import traceback
             traceback.print_exc()
             await update.message.reply_text(f"❌ Ошибка при обработке файла: {e}")
     
@@ -1506,7 +1933,7 @@ class TelegramVacancyBot:
             # Отвечаем на callback
             try:
                 await query.answer("⏳ Обрабатываю...")
-                print("✅ Callback answer отправлен")
+                logger.debug("✅ Callback answer отправлен")
             except Exception as e:
                 print(f"⚠️ Ошибка при отправке callback answer: {e}")
             
@@ -1528,7 +1955,7 @@ class TelegramVacancyBot:
                 'active': True,
                 'created_at': datetime.now().isoformat()
             }
-            self._save_users_data()
+            self._mark_dirty('users')
             print(f"✅ Подписка активирована для user_id: {user_id}")
             
             # Подтверждаем должность, вакансии не отправляем — пользователь нажимает «Отправить вакансии» сам
@@ -1552,7 +1979,6 @@ class TelegramVacancyBot:
             
         except Exception as e:
             print(f"❌ Ошибка при подтверждении должности: {e}")
-            import traceback
             traceback.print_exc()
             try:
                 await query.answer(f"Ошибка: {e}", show_alert=True)
@@ -1567,12 +1993,11 @@ class TelegramVacancyBot:
                 "Пожалуйста, отправьте название желаемой должности текстовым сообщением."
             )
             # Сохраняем состояние, что пользователь хочет указать должность
-            if not hasattr(context.user_data, 'awaiting_position'):
-                context.user_data['awaiting_position'] = {}
-            context.user_data['awaiting_position'][user_id] = True
+            # (user_data — словарь, hasattr на нём всегда False и старый код
+            # затирал уже сохранённое состояние новым словарём)
+            context.user_data.setdefault('awaiting_position', {})[user_id] = True
         except Exception as e:
             print(f"❌ Ошибка при изменении должности: {e}")
-            import traceback
             traceback.print_exc()
     
     async def _send_vacancies_for_user(self, user_id: int, position: str, context: ContextTypes.DEFAULT_TYPE):
@@ -1592,21 +2017,20 @@ class TelegramVacancyBot:
                 print(f"❌ Ошибка при отправке сообщения о поиске: {e}")
                 raise
             
-            # Импортируем класс поисковика
-            from ios_vacancies_finder import ProductManagerVacancyFinder
-            
             # Создаем поисковик с должностью пользователя
             finder = ProductManagerVacancyFinder(max_vacancies=10)
             
             # Модифицируем поиск для использования должности пользователя
             vacancies = []
-            
-            # Поиск на hh.ru
-            hh_vacancies = self._search_hh_ru_for_position(position, finder)
+
+            # Оба блокирующих поиска уходят в потоки и выполняются параллельно:
+            # сетевые round-trip'ы к hh.ru и Habr перекрываются, а event loop
+            # продолжает обслуживать остальные чаты
+            hh_vacancies, habr_vacancies = await asyncio.gather(
+                asyncio.to_thread(self._search_hh_ru_for_position, position, finder),
+                asyncio.to_thread(self._search_habr_for_position, position, finder)
+            )
             vacancies.extend(hh_vacancies)
-            
-            # Поиск на Habr Career
-            habr_vacancies = self._search_habr_for_position(position, finder)
             vacancies.extend(habr_vacancies)
             
             if not vacancies:
@@ -1616,19 +2040,9 @@ class TelegramVacancyBot:
                 )
                 return
             
-            # Отправляем вакансии
-            sent_count = 0
-            for vacancy in vacancies[:10]:  # Ограничиваем 10 вакансиями
-                try:
-                    # Используем существующий метод отправки с указанием chat_id пользователя
-                    success = await self.send_vacancy(vacancy, context, chat_id=user_id)
-                    if success:
-                        sent_count += 1
-                        # Небольшая задержка между отправками
-                        import asyncio
-                        await asyncio.sleep(1)
-                except Exception as e:
-                    print(f"⚠️ Ошибка при отправке вакансии: {e}")
+            # Отправляем вакансии пачкой с ограниченной параллельностью
+            # вместо последовательного цикла с секундной паузой на каждую
+            sent_count = await self._send_batch(vacancies[:10], context, user_id)
             
             await context.bot.send_message(
                 chat_id=chat_id,
@@ -1637,7 +2051,6 @@ class TelegramVacancyBot:
             
         except Exception as e:
             print(f"❌ Ошибка при отправке вакансий пользователю: {e}")
-            import traceback
             traceback.print_exc()
             try:
                 await context.bot.send_message(
@@ -1647,19 +2060,16 @@ class TelegramVacancyBot:
             except:
                 pass
     
-    def _search_hh_ru_for_position(self, position: str, finder) -> List[Dict]:
-        """Поиск вакансий на hh.ru по должности"""
+    def _search_hh_ru_for_position(self, position: str, finder, limit: int = 10) -> List[Dict]:
+        """Поиск вакансий на hh.ru по должности (не больше limit результатов)"""
         try:
-            import requests
             vacancies = []
             
             # Используем API hh.ru для поиска
             url = 'https://api.hh.ru/vacancies'
             
-            # Используем заголовки из finder или создаём свои
-            headers = finder.headers if finder and hasattr(finder, 'headers') else {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            # Заголовки finder'а, если есть; иначе хватает User-Agent сессии
+            headers = finder.headers if finder and hasattr(finder, 'headers') else None
             
             # Функция для форматирования зарплаты
             def format_salary(salary_data):
@@ -1679,26 +2089,24 @@ class TelegramVacancyBot:
             params = {
                 'text': position,
                 'area': 1,  # Москва
-                'per_page': 50,  # Увеличиваем для получения большего количества
+                'per_page': limit,  # Больше всё равно не показываем
                 'page': 0,
                 'order_by': 'publication_time',  # Сортируем по времени публикации
                 'period': 1  # За последние 24 часа
             }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+
+            response = _HTTP_SESSION.get(url, params=params, headers=headers, timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 items = data.get('items', [])
-                
+
                 for item in items:
+                    # Только поля, которые реально потребляет send_vacancy
                     vacancy = {
                         'title': item.get('name', ''),
                         'company': item.get('employer', {}).get('name', ''),
                         'location': item.get('area', {}).get('name', ''),
                         'salary': format_salary(item.get('salary')),
-                        'salary_data': item.get('salary'),
-                        'experience': item.get('experience', {}).get('id'),
-                        'experience_name': item.get('experience', {}).get('name', ''),
                         'url': item.get('alternate_url', ''),
                         'source': 'hh.ru',
                         'published': item.get('published_at', '')
@@ -1708,7 +2116,6 @@ class TelegramVacancyBot:
             return vacancies
         except Exception as e:
             print(f"❌ Ошибка при поиске на hh.ru: {e}")
-            import traceback
             traceback.print_exc()
             return []
     
@@ -1736,9 +2143,6 @@ class TelegramVacancyBot:
         Загружает до 30 самых свежих вакансий по должности с HH (по дате публикации убывание:
         сначала сегодня, потом вчера, позавчера и т.д.).
         """
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
         url = 'https://api.hh.ru/vacancies'
         
         def format_salary(salary_data):
@@ -1766,10 +2170,10 @@ class TelegramVacancyBot:
                 'order_by': 'publication_time',
             }
             try:
-                response = requests.get(url, params=params, headers=headers, timeout=15)
+                response = _HTTP_SESSION.get(url, params=params, timeout=15)
                 if response.status_code != 200:
                     break
-                data = response.json()
+                data = _json_loads(response.content)
                 items = data.get('items', [])
                 if not items:
                     break
@@ -1803,8 +2207,6 @@ class TelegramVacancyBot:
     def _search_habr_for_position(self, position: str, finder) -> List[Dict]:
         """Поиск вакансий на Habr Career по должности"""
         try:
-            import requests
-            from bs4 import BeautifulSoup
             
             vacancies = []
             url = "https://career.habr.com/vacancies"
@@ -1813,9 +2215,9 @@ class TelegramVacancyBot:
                 'type': 'all'
             }
             
-            response = requests.get(url, params=params, headers=finder.headers, timeout=10)
+            response = _HTTP_SESSION.get(url, params=params, headers=finder.headers, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = BeautifulSoup(response.text, _BS4_PARSER)
                 items = soup.find_all('div', class_='vacancy-card')[:20]
                 
                 for item in items:
@@ -1860,25 +2262,11 @@ class TelegramVacancyBot:
         text = update.message.text
         
         # Обработка кнопок меню
-        if text == "📤 Отправить вакансии":
-            await self.send_fresh_batch_command(update, context)
-            return
-        elif text == "📄 Резюме":
-            await self.resume_command(update, context)
-            return
-        elif text == "🗑️ Очистить резюме":
-            await self.clear_resume_command(update, context)
-            return
-        elif text == "🔄 Очистить отправленные":
-            await self.clear_sent_command(update, context)
+        handler = self._menu_dispatch.get(text)
+        if handler is not None:
+            await handler(update, context)
             return
-        elif text == "ℹ️ Помощь":
-            await self.help_command(update, context)
-            return
-        elif text == "📋 Меню":
-            await self.menu_command(update, context)
-            return
-        
+
         # Если это не кнопка меню, обрабатываем как резюме
         await self.handle_text_resume(update, context)
     
@@ -1896,10 +2284,9 @@ class TelegramVacancyBot:
             # Сохраняем резюме
             self.resumes[user_id] = resume_text
             
-            # Сохраняем в файл
-            resume_text_file = os.path.join(self.resumes_dir, f"resume_{user_id}.txt")
-            with open(resume_text_file, 'w', encoding='utf-8') as f:
-                f.write(resume_text)
+            # Сохраняем в файл (сжатие и запись — в потоке)
+            resume_text_file = os.path.join(self.resumes_dir, f"resume_{user_id}.txt.gz")
+            await asyncio.to_thread(self._write_resume_text, resume_text_file, resume_text)
             
             await update.message.reply_text(
                 f"✅ Резюме сохранено!\n\n"
@@ -1937,10 +2324,11 @@ class TelegramVacancyBot:
         
         if user_id in self.resumes:
             del self.resumes[user_id]
-            # Удаляем файл
-            resume_text_file = os.path.join(self.resumes_dir, f"resume_{user_id}.txt")
-            if os.path.exists(resume_text_file):
-                os.remove(resume_text_file)
+            # Удаляем файл (и возможную старую несжатую копию)
+            base = os.path.join(self.resumes_dir, f"resume_{user_id}.txt")
+            for resume_text_file in (base + '.gz', base):
+                if os.path.exists(resume_text_file):
+                    os.remove(resume_text_file)
             
             menu_keyboard = self.get_menu_keyboard()
             await update.message.reply_text("✅ Резюме удалено.", reply_markup=menu_keyboard)
@@ -1952,28 +2340,57 @@ class TelegramVacancyBot:
         """Извлечение текста из файла резюме"""
         try:
             file_ext = os.path.splitext(file_path)[1].lower()
-            
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            return self._extract_text_from_bytes(data, file_ext)
+        except Exception as e:
+            print(f"Ошибка при извлечении текста: {e}")
+            return ""
+
+    def _extract_text_from_bytes(self, data: bytes, file_ext: str) -> str:
+        """Извлечение текста резюме из содержимого файла в памяти.
+
+        Разбирает скачанный документ сразу из байтов, не дожидаясь записи
+        на диск и не перечитывая файл обратно.
+        """
+        try:
             if file_ext == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                return data.decode('utf-8', 'replace')
             elif file_ext == '.pdf':
+                # PyMuPDF извлекает текст на порядок быстрее PyPDF2;
+                # используем его, если установлен, PyPDF2 остаётся запасным
+                try:
+                    import fitz  # PyMuPDF
+                    with fitz.open(stream=data, filetype='pdf') as doc:
+                        return "\n".join(page.get_text() for page in doc)
+                except ImportError:
+                    pass
+                except Exception as e:
+                    print(f"Ошибка при чтении PDF (PyMuPDF): {e}")
+                    return ""
                 try:
                     import PyPDF2
-                    with open(file_path, 'rb') as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
-                        text = ""
-                        for page in pdf_reader.pages:
-                            text += page.extract_text() + "\n"
-                        return text
+                    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+                    return "\n".join(page.extract_text() for page in pdf_reader.pages)
                 except ImportError:
                     return "⚠️ Для обработки PDF требуется библиотека PyPDF2. Установите: pip install PyPDF2"
                 except Exception as e:
                     print(f"Ошибка при чтении PDF: {e}")
                     return ""
             elif file_ext in ['.doc', '.docx']:
+                # docx2txt читает документ без материализации XML-дерева —
+                # быстрее python-docx примерно вдвое на реальных файлах
+                try:
+                    import docx2txt
+                    return docx2txt.process(io.BytesIO(data))
+                except ImportError:
+                    pass
+                except Exception as e:
+                    print(f"Ошибка при чтении DOC/DOCX (docx2txt): {e}")
+                    return ""
                 try:
                     from docx import Document
-                    doc = Document(file_path)
+                    doc = Document(io.BytesIO(data))
                     text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
                     return text
                 except ImportError:
@@ -1987,26 +2404,47 @@ class TelegramVacancyBot:
             print(f"Ошибка при извлечении текста: {e}")
             return ""
     
+    @staticmethod
+    def _write_resume_text(path: str, text: str):
+        """Синхронная запись текста резюме (вызывается через asyncio.to_thread).
+
+        Текст сжимается gzip'ом: резюме — проза, сжатие в 3-5 раз сокращает
+        и файлы на диске, и объём чтения при старте.
+        """
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write(text)
+        # Миграция со старого формата: после записи .txt.gz удаляем
+        # одноимённый несжатый .txt, иначе при следующем старте
+        # _load_saved_resumes может прочитать устаревший файл
+        if path.endswith('.gz'):
+            Path(path[:-3]).unlink(missing_ok=True)
+
+    @staticmethod
+    def _write_file_bytes(path: str, data: bytes):
+        """Синхронная запись скачанного файла (вызывается через asyncio.to_thread)"""
+        with open(path, 'wb') as f:
+            f.write(data)
+
     def _load_saved_resumes(self):
         """Загрузка сохраненных резюме при запуске"""
         try:
-            if not os.path.exists(self.resumes_dir):
-                return
-            for filename in os.listdir(self.resumes_dir):
-                if filename.startswith('resume_') and filename.endswith('.txt'):
+            # os.scandir отдаёт имя и тип файла одним системным вызовом на
+            # запись, без отдельных exists/join/stat на каждый файл
+            with os.scandir(self.resumes_dir) as entries:
+                for entry in entries:
+                    m = _RESUME_FILE_RE.match(entry.name)
+                    if not m or not entry.is_file():
+                        continue
                     try:
-                        # Извлекаем user_id из имени файла (формат: resume_USERID.txt)
-                        user_id_str = filename.replace('resume_', '').replace('.txt', '')
-                        # Если есть дополнительные части (например, имя файла), берем только первую
-                        if '_' in user_id_str:
-                            user_id_str = user_id_str.split('_')[0]
-                        user_id = int(user_id_str)
-                        file_path = os.path.join(self.resumes_dir, filename)
-                        with open(file_path, 'r', encoding='utf-8') as f:
+                        user_id = int(m.group(1))
+                        opener = gzip.open if entry.name.endswith('.gz') else open
+                        with opener(entry.path, 'rt', encoding='utf-8') as f:
                             self.resumes[user_id] = f.read()
                         print(f"✅ Загружено резюме для user_id: {user_id}")
-                    except (ValueError, Exception) as e:
-                        print(f"⚠️ Ошибка при загрузке резюме {filename}: {e}")
+                    except (OSError, ValueError) as e:
+                        print(f"⚠️ Ошибка при загрузке резюме {entry.name}: {e}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"⚠️ Ошибка при загрузке резюме: {e}")
     
@@ -2070,19 +2508,8 @@ class TelegramVacancyBot:
         
         print(f"📤 Отправляю {len(vacancies_to_send)} вакансий в chat_id={target_chat_id} (осталось {remaining_count})...")
         
-        sent_count = 0
-        failed_count = 0
-        for vacancy in vacancies_to_send:
-            try:
-                success = await self.send_vacancy(vacancy, context, chat_id=target_chat_id)
-                if success:
-                    sent_count += 1
-                else:
-                    failed_count += 1
-                await asyncio.sleep(1)  # Задержка между отправками
-            except Exception as e:
-                print(f"❌ Ошибка при отправке вакансии {vacancy.get('title', 'Без названия')}: {e}")
-                failed_count += 1
+        sent_count = await self._send_batch(vacancies_to_send, context, target_chat_id)
+        failed_count = len(vacancies_to_send) - sent_count
         
         print(f"✅ Отправлено {sent_count} из {len(vacancies_to_send)} вакансий!")
         if failed_count > 0:
@@ -2092,7 +2519,31 @@ class TelegramVacancyBot:
         if remaining_count > 0 and show_more_button:
             await self._send_more_button(context, remaining_count, chat_id=target_chat_id)
     
+    async def _send_batch(self, vacancies: List[Dict], context: ContextTypes.DEFAULT_TYPE, chat_id: int) -> int:
+        """Отправка пачки вакансий в один чат с сохранением порядка.
+
+        Сообщения уходят последовательно с паузой ~1 с между ними: лимит
+        Telegram на один чат — порядка 1 msg/s, и AIORateLimiter тут не
+        помогает — пер-чатовый бакет он применяет только к группам и
+        каналам, личные чаты попадают лишь в общий бакет 30 msg/s.
+        """
+        sent_count = 0
+        for i, vacancy in enumerate(vacancies):
+            if i:
+                await asyncio.sleep(1)
+            try:
+                if await self.send_vacancy(vacancy, context, chat_id=chat_id):
+                    sent_count += 1
+            except Exception as e:
+                print(f"⚠️ Ошибка при отправке вакансии {vacancy.get('title', 'Без названия')}: {e}")
+        return sent_count
+
     def get_menu_keyboard(self) -> ReplyKeyboardMarkup:
+        """Клавиатура меню (собирается один раз и переиспользуется)"""
+        return self._menu_keyboard
+
+    @staticmethod
+    def _build_menu_keyboard() -> ReplyKeyboardMarkup:
         """Создание клавиатуры меню"""
         keyboard = [
             [KeyboardButton("📤 Отправить вакансии")],
@@ -2118,15 +2569,7 @@ class TelegramVacancyBot:
         menu_keyboard = self.get_menu_keyboard()
         
         await update.message.reply_text(
-            "📋 <b>Меню бота</b>\n\n"
-            "Доступные функции:\n\n"
-            "📤 <b>Отправить вакансии</b> — подборка 30 свежих вакансий по дате (пачками по 10)\n"
-            "📄 <b>Резюме</b> - загрузить или посмотреть резюме\n"
-            "🗑️ <b>Очистить резюме</b> - удалить загруженное резюме\n"
-            "🔄 <b>Очистить отправленные</b> - очистить список отправленных вакансий\n"
-            "ℹ️ <b>Помощь</b> - показать справку\n"
-            "📋 <b>Меню</b> - показать это меню\n\n"
-            f"📊 Отправлено вакансий ранее: {sent_count}",
+            _MENU_TEXT_PREFIX + f"📊 Отправлено вакансий ранее: {sent_count}",
             reply_markup=menu_keyboard,
             parse_mode='HTML'
         )
@@ -2154,14 +2597,7 @@ class TelegramVacancyBot:
                 return
             self.user_fresh_batch[user_id] = {'vacancies': vacancies_30, 'offset': 0}
             to_send = vacancies_30[:10]
-            sent = 0
-            for v in to_send:
-                try:
-                    if await self.send_vacancy(v, context, chat_id=user_id):
-                        sent += 1
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    print(f"⚠️ Ошибка при отправке вакансии: {e}")
+            sent = await self._send_batch(to_send, context, user_id)
             self.user_fresh_batch[user_id]['offset'] = 10
             remaining = len(vacancies_30) - 10
             if remaining > 0:
@@ -2174,7 +2610,6 @@ class TelegramVacancyBot:
                 )
         except Exception as e:
             print(f"❌ Ошибка в send_fresh_batch_command: {e}")
-            import traceback
             traceback.print_exc()
             try:
                 await update.message.reply_text(f"❌ Ошибка: {e}", reply_markup=menu_keyboard)
@@ -2183,8 +2618,7 @@ class TelegramVacancyBot:
     
     async def _send_more_fresh_button(self, context: ContextTypes.DEFAULT_TYPE, remaining_count: int, chat_id: int):
         """Сообщение с кнопкой «Отправить ещё вакансии» для подборки из 30."""
-        keyboard = [[InlineKeyboardButton("📤 Отправить ещё вакансии", callback_data="send_more")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = _SEND_MORE_MARKUP
         message = (
             f"✅ Отправлено 10 вакансий!\n\n"
             f"📊 Осталось в подборке: {remaining_count}\n\n"
@@ -2205,8 +2639,10 @@ class TelegramVacancyBot:
         """Команда /clear_sent - очистка списка отправленных вакансий"""
         try:
             self.sent_vacancies.clear()
-            if os.path.exists(self.sent_vacancies_file):
-                os.remove(self.sent_vacancies_file)
+            # unlink(missing_ok=True): одно обращение к ФС вместо пары
+            # exists+remove и без гонки между проверкой и удалением
+            Path(self.sent_vacancies_file).unlink(missing_ok=True)
+            Path(self.sent_vacancies_log_file).unlink(missing_ok=True)
             menu_keyboard = self.get_menu_keyboard()
             await update.message.reply_text("✅ Список отправленных вакансий очищен!", reply_markup=menu_keyboard)
             print("✅ Список отправленных вакансий очищен")
@@ -2223,19 +2659,29 @@ class TelegramVacancyBot:
         try:
             user_id = update.message.from_user.id
             menu_keyboard = self.get_menu_keyboard()
-            
+            user_sent = self.user_sent_fresh_vacancies.get(user_id, set())
+
+            # Если всё известное за сегодня уже отправлено этому пользователю,
+            # повторный клик не запускает дорогой рескан hh.ru: список и так
+            # обновляется фоновым сканером каждые 30 минут
+            if self._today_urls and not (self._today_urls - user_sent):
+                await update.message.reply_text(
+                    "😔 Нет новых свежих вакансий за сегодня.\n\n"
+                    "Бот автоматически сканирует hh.ru и обновляет список свежих вакансий.",
+                    reply_markup=menu_keyboard
+                )
+                return
+
             # Обновляем свежие вакансии перед отправкой
             await self._scan_fresh_vacancies()
-            
-            # Получаем вакансии, которые ещё не были отправлены этому пользователю
-            user_sent = self.user_sent_fresh_vacancies.get(user_id, set())
-            today = datetime.now().date()
-            
-            # Фильтруем свежие вакансии за сегодня, которые ещё не отправлены
+
+            # Новые для пользователя URL — одна разность множеств; сами
+            # вакансии достаются из индекса {url: vacancy} с сохранением
+            # порядка скана
+            new_urls = self._today_urls - user_sent
             available_vacancies = [
-                v for v in self.fresh_vacancies
-                if v.get('url', '') not in user_sent
-                and self._is_vacancy_from_today(v.get('published', ''), today)
+                v for url, v in self.fresh_vacancies_by_url.items()
+                if url in new_urls
             ]
             
             if not available_vacancies:
@@ -2255,21 +2701,21 @@ class TelegramVacancyBot:
                 reply_markup=menu_keyboard
             )
             
-            for vacancy in vacancies_to_send:
+            # Отправляем по одному с паузой ~1 с, как в _send_batch (лимит
+            # Telegram на один чат); результаты сохраняем одним разом
+            user_sent_set = self.user_sent_fresh_vacancies.setdefault(user_id, set())
+            for i, vacancy in enumerate(vacancies_to_send):
+                if i:
+                    await asyncio.sleep(1)
                 try:
-                    success = await self.send_vacancy(vacancy, context, chat_id=user_id)
-                    if success:
+                    if await self.send_vacancy(vacancy, context, chat_id=user_id):
                         sent_count += 1
-                        # Отмечаем как отправленную этому пользователю
-                        if user_id not in self.user_sent_fresh_vacancies:
-                            self.user_sent_fresh_vacancies[user_id] = set()
-                        self.user_sent_fresh_vacancies[user_id].add(vacancy.get('url', ''))
-                        await asyncio.sleep(1)  # Задержка между отправками
+                        user_sent_set.add(vacancy.get('url', ''))
                 except Exception as e:
                     print(f"❌ Ошибка при отправке свежей вакансии: {e}")
-            
-            # Сохраняем данные об отправленных вакансиях
-            self._save_user_sent_fresh()
+
+            # Помечаем данные об отправленных вакансиях для записи
+            self._mark_dirty('user_sent_fresh')
             
             remaining = len(available_vacancies) - sent_count
             await update.message.reply_text(
@@ -2281,7 +2727,6 @@ class TelegramVacancyBot:
             
         except Exception as e:
             print(f"❌ Ошибка при отправке свежих вакансий: {e}")
-            import traceback
             traceback.print_exc()
             try:
                 menu_keyboard = self.get_menu_keyboard()
@@ -2296,59 +2741,69 @@ class TelegramVacancyBot:
         """Сканирование hh.ru для получения свежих вакансий за сегодня"""
         try:
             print("🔍 Сканирую hh.ru для получения свежих вакансий...")
-            today = datetime.now().date()
-            
-            # Получаем все активные подписки пользователей
-            active_positions = set()
-            for sub in self.user_subscriptions.values():
-                if sub.get('active', False):
-                    active_positions.add(sub.get('position', ''))
-            
+            today_iso = datetime.now().date().isoformat()
+            
+            # Все активные подписки одним set-comprehension: дубликаты
+            # должностей схлопываются сразу, и каждая должность
+            # запрашивается по сети ровно один раз за скан
+            active_positions = {
+                sub.get('position', '')
+                for sub in self.user_subscriptions.values()
+                if sub.get('active', False)
+            }
+            active_positions.discard('')
+
             # Если нет активных подписок, используем общий поиск
             if not active_positions:
                 active_positions = {'Product Manager', 'Продакт менеджер'}
             
-            new_vacancies = []
-            
-            # Сканируем для каждой должности
-            for position in active_positions:
-                if not position:
-                    continue
-                
-                vacancies = self._search_hh_ru_for_position(position, None)
-                
-                # Фильтруем только сегодняшние вакансии
-                today_vacancies = [
-                    v for v in vacancies
-                    if self._is_vacancy_from_today(v.get('published', ''), today)
-                ]
-                
-                new_vacancies.extend(today_vacancies)
-            
-            # Удаляем дубликаты по URL
-            seen_urls = set()
-            unique_vacancies = []
-            for v in new_vacancies:
+            # Один проход вместо трёх: фильтр «за сегодня» и дедупликация
+            # по URL выполняются сразу при обходе результатов поиска.
+            # dict сохраняет порядок вставки, а его ключи заодно служат
+            # набором уже увиденных URL. Уже известные сегодняшние вакансии
+            # переносятся из прошлого скана; вчерашние отпадают сами.
+            fresh_by_url = {}
+            for v in self.fresh_vacancies:
                 url = v.get('url', '')
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_vacancies.append(v)
-            
-            # Обновляем список свежих вакансий
-            # Сохраняем только сегодняшние
-            self.fresh_vacancies = [
-                v for v in unique_vacancies
-                if self._is_vacancy_from_today(v.get('published', ''), today)
-            ]
-            
-            # Сохраняем в файл
-            self._save_fresh_vacancies()
+                if url and url not in fresh_by_url and v.get('published', '')[:10] == today_iso:
+                    fresh_by_url[url] = v
+
+            # Все должности опрашиваются параллельно в пуле потоков:
+            # блокирующий HTTP не держит event loop, а общее время скана
+            # равно самому медленному запросу, а не их сумме
+            positions = list(active_positions)
+            # limit=50: сканер ходит раз в 30 минут, и на активных запросах
+            # первых 10 результатов не хватает — вакансии 11+ были бы
+            # навсегда пропущены за этот день
+            results = await asyncio.gather(
+                *(
+                    asyncio.to_thread(self._search_hh_ru_for_position, position, None, 50)
+                    for position in positions
+                ),
+                return_exceptions=True
+            )
+            for position, vacancies in zip(positions, results):
+                if isinstance(vacancies, BaseException):
+                    print(f"⚠️ Ошибка сканирования '{position}': {vacancies}")
+                    continue
+                for v in vacancies:
+                    url = v.get('url', '')
+                    if url and url not in fresh_by_url and v.get('published', '')[:10] == today_iso:
+                        fresh_by_url[url] = v
+
+            self.fresh_vacancies = list(fresh_by_url.values())
+            self.fresh_vacancies_by_url = fresh_by_url
+            # Набор сегодняшних URL уже собран дедупликацией — сохраняем его
+            # для O(1)-проверок принадлежности вместо разборов даты
+            self._today_urls = set(fresh_by_url)
+
+            # Помечаем список для записи на диск
+            self._mark_dirty('fresh')
             
             print(f"✅ Найдено {len(self.fresh_vacancies)} свежих вакансий за сегодня")
             
         except Exception as e:
             print(f"❌ Ошибка при сканировании свежих вакансий: {e}")
-            import traceback
             traceback.print_exc()
     
     async def _start_vacancy_scanner(self, app):
@@ -2361,15 +2816,29 @@ class TelegramVacancyBot:
             # Проверяем наличие job_queue
             if not app.job_queue:
                 print("⚠️ Job queue не инициализирован, используем альтернативный метод")
-                # Используем альтернативный метод через asyncio
+                # Используем альтернативный метод через asyncio.
+                # Расписание считается от монотонных часов: следующий запуск
+                # назначается на next_at += interval, поэтому длительность
+                # самого скана не сдвигает сетку запусков
                 async def periodic_scan():
+                    next_at = asyncio.get_running_loop().time() + 1800  # 30 минут
                     while True:
-                        await asyncio.sleep(1800)  # 30 минут
+                        delay = next_at - asyncio.get_running_loop().time()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        next_at += 1800
                         print("🔍 Периодическое сканирование свежих вакансий...")
                         await self._scan_fresh_vacancies()
-                
-                # Запускаем в фоне
-                asyncio.create_task(periodic_scan())
+
+                async def periodic_flush():
+                    while True:
+                        await asyncio.sleep(5)
+                        await asyncio.to_thread(self._flush_state)
+
+                # Запускаем в фоне; ссылки сохраняем на боте, иначе сборщик
+                # мусора может отменить безымянные задачи
+                self._scan_task = asyncio.create_task(periodic_scan())
+                self._flush_task = asyncio.create_task(periodic_flush())
                 print("✅ Периодическое сканирование вакансий запущено через asyncio (каждые 30 минут)")
             else:
                 # Настраиваем периодическое сканирование каждые 30 минут через job_queue
@@ -2383,36 +2852,19 @@ class TelegramVacancyBot:
                     interval=1800,  # 30 минут
                     first=1800  # Первый запуск через 30 минут
                 )
+                # Коалесцированная запись состояния: одна задача раз в 5 секунд
+                # вместо записи файла на каждое изменение
+                app.job_queue.run_repeating(self._flush_state_job, interval=5.0, first=5.0)
                 print("✅ Периодическое сканирование вакансий настроено через job_queue (каждые 30 минут)")
         except Exception as e:
             print(f"⚠️ Ошибка при запуске сканера вакансий: {e}")
-            import traceback
             traceback.print_exc()
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Команда /help - справка по использованию бота"""
         menu_keyboard = self.get_menu_keyboard()
         await update.message.reply_text(
-            "ℹ️ <b>Справка по использованию бота</b>\n\n"
-            "<b>Основные команды:</b>\n"
-            "/start - запустить бота и показать приветствие\n"
-            "/send - подборка свежих вакансий (30 по дате, пачками по 10)\n"
-            "/menu - показать меню с кнопками\n"
-            "/help - показать эту справку\n\n"
-            "<b>Работа с резюме:</b>\n"
-            "/resume - загрузить резюме (файл или текст)\n"
-            "/clear_resume - удалить загруженное резюме\n\n"
-            "<b>Управление вакансиями:</b>\n"
-            "/clear_sent - очистить список отправленных вакансий\n\n"
-            "<b>Отправить вакансии:</b>\n"
-            "📤 Кнопка загружает 30 самых свежих вакансий (по дате: сегодня → вчера → позавчера…).\n"
-            "Сначала приходит 10 вакансий, внизу кнопка «Отправить ещё вакансии» — ещё по 10, всего до 30.\n\n"
-            "<b>Как использовать:</b>\n"
-            "1. Загрузите резюме командой /resume или через меню (должность подставится в поиск)\n"
-            "2. Нажмите «Отправить вакансии» — получите первую пачку из 10\n"
-            "3. Нажмите «Отправить ещё вакансии» для следующих 10 (до 30 в подборке)\n"
-            "4. Для каждой вакансии можно запросить сопроводительное письмо\n\n"
-            "💡 Используйте кнопки меню для быстрого доступа к функциям!",
+            _HELP_TEXT,
             reply_markup=menu_keyboard,
             parse_mode='HTML'
         )
@@ -2420,6 +2872,12 @@ class TelegramVacancyBot:
 
 def main():
     """Основная функция"""
+    # Уровень отладочного лога настраивается окружением: LOG_LEVEL=DEBUG
+    # включает подробный след обработчиков без правок кода
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)s %(message)s',
+        level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
+    )
     # Перезагружаем переменные на случай, если они изменились
     global TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
     TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
@@ -2446,33 +2904,7 @@ def main():
     print(f"✅ Chat ID загружен: {TELEGRAM_CHAT_ID}")
     
     bot = TelegramVacancyBot()
-    
-    # Проверяем подключение к Telegram API перед запуском
-    print("🔍 Проверяю подключение к Telegram API...")
-    try:
-        import asyncio
-        from telegram import Bot
-        
-        async def test_connection():
-            bot = Bot(token=TELEGRAM_BOT_TOKEN)
-            try:
-                me = await bot.get_me()
-                print(f"✅ Бот подключен: @{me.username}")
-                return True
-            except Exception as e:
-                print(f"❌ Ошибка подключения: {e}")
-                return False
-        
-        if not asyncio.run(test_connection()):
-            print("\n⚠️ Не удалось подключиться к Telegram API.")
-            print("Проверьте:")
-            print("1. Интернет-соединение")
-            print("2. Правильность токена бота")
-            print("3. Доступность api.telegram.org")
-            return
-    except Exception as e:
-        print(f"⚠️ Ошибка при проверке подключения: {e}")
-    
+
     # Создаем приложение с увеличенным таймаутом
     # Исправляем проблему с event loop для Python 3.9+
     try:
@@ -2481,17 +2913,48 @@ def main():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
     
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    # concurrent_updates: обновления разных пользователей обрабатываются
+    # параллельно, долгий разбор резюме одного не блокирует остальных
+    builder = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(True)
+    )
+    # AIORateLimiter (extra "rate-limiter"): общий token bucket 30 msg/s
+    # плюс до 3 повторов по RetryAfter при флуд-контроле. Личные чаты
+    # лимитер по-чатно НЕ ограничивает — за ~1 msg/s в один чат отвечает
+    # пауза в _send_batch. PTB поднимает RuntimeError из конструктора,
+    # если aiolimiter не установлен (сам импорт класса при этом проходит)
+    try:
+        from telegram.ext import AIORateLimiter
+        builder = builder.rate_limiter(AIORateLimiter(max_retries=3))
+    except (ImportError, RuntimeError) as e:
+        print(f"⚠️ AIORateLimiter недоступен, работаем без лимитера: {e}")
+    application = builder.build()
     
     # Запускаем периодическое сканирование вакансий после запуска polling
     async def post_init(app: Application) -> None:
         """Инициализация после запуска приложения"""
+        # Проверка подключения уже инициализированным ботом приложения:
+        # раньше для этого создавался отдельный Bot и отдельный event loop
+        try:
+            me = await app.bot.get_me()
+            print(f"✅ Бот подключен: @{me.username}")
+        except Exception as e:
+            print(f"⚠️ Не удалось проверить подключение к Telegram API: {e}")
         # Небольшая задержка для полной инициализации job_queue
         await asyncio.sleep(2)
         await bot._start_vacancy_scanner(app)
     
     application.post_init = post_init
-    
+
+    # При остановке бота досбрасываем несохранённое состояние на диск
+    async def post_shutdown(app: Application) -> None:
+        """Финальный сброс состояния при завершении работы"""
+        bot._flush_state()
+
+    application.post_shutdown = post_shutdown
+
     # Добавляем обработчик ошибок
     async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Обработка ошибок"""
@@ -2499,12 +2962,9 @@ def main():
         if isinstance(error, Exception):
             error_msg = str(error)
             print(f"❌ Ошибка: {error_msg}")
-            if "Timed out" in error_msg or "ConnectTimeout" in error_msg:
-                print("⚠️ Таймаут подключения к Telegram. Проверьте интернет-соединение.")
-            elif "Unauthorized" in error_msg:
-                print("⚠️ Неверный токен бота. Проверьте TELEGRAM_BOT_TOKEN.")
-            elif "Chat not found" in error_msg:
-                print("⚠️ Чат не найден. Проверьте TELEGRAM_CHAT_ID.")
+            match = _TG_ERROR_RE.search(error_msg)
+            if match:
+                print(_TG_ERROR_HINTS[match.lastgroup])
     
     application.add_error_handler(error_handler)
     
@@ -2521,8 +2981,9 @@ def main():
     application.add_handler(CommandHandler("help", bot.help_command))
     application.add_handler(CallbackQueryHandler(bot.handle_callback))
     
-    # Обработчики для загрузки резюме
-    application.add_handler(MessageHandler(filters.Document.ALL, bot.handle_document))
+    # Обработчики для загрузки резюме (block=False: тяжёлый разбор файла
+    # не задерживает диспетчеризацию следующих обновлений)
+    application.add_handler(MessageHandler(filters.Document.ALL, bot.handle_document, block=False))
     # Обработчик текстовых сообщений (кнопки меню и резюме)
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, bot.handle_text_message))
     